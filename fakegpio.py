@@ -0,0 +1,125 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# in-memory stand-in for RPi.GPIO so the button and relay logic can run on a laptop
+# used the same way as the real module (import fakegpio as GPIO); buttons are pressed from code
+# with press()/set_input(), and edge callbacks run on their own thread like RPi.GPIO's event thread
+# relay and motor outputs are kept in outputs, with every change logged in output_log
+
+import queue
+import threading
+import time
+
+BCM = 11
+BOARD = 10
+IN = 1
+OUT = 0
+HIGH = 1
+LOW = 0
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+RISING = 31
+FALLING = 32
+BOTH = 33
+
+mode = None
+inputs = {}
+outputs = {}
+# (time.monotonic(), pin, level) for every output change
+output_log = []
+
+_lock = threading.Lock()
+# pin -> [edge, bouncetime in seconds, time of the last accepted edge, callbacks, detected flag]
+_detect = {}
+_callbacks = queue.Queue()
+_thread = None
+
+def setwarnings(flag):
+    pass
+
+def setmode(new_mode):
+    global mode
+    mode = new_mode
+
+def setup(pin, direction, pull_up_down=PUD_OFF, initial=LOW):
+    if direction == IN:
+        inputs[pin] = HIGH if pull_up_down == PUD_UP else LOW
+    else:
+        outputs[pin] = initial
+
+def output(pin, level):
+    with _lock:
+        outputs[pin] = level
+        output_log.append((time.monotonic(), pin, level))
+
+def input(pin):
+    if pin in inputs:
+        return inputs[pin]
+    return outputs.get(pin, LOW)
+
+def _run_callbacks():
+    while True:
+        callback, pin = _callbacks.get()
+        callback(pin)
+
+def add_event_detect(pin, edge, callback=None, bouncetime=None):
+    global _thread
+    with _lock:
+        if pin in _detect:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        _detect[pin] = [edge, (bouncetime or 0) / 1000.0, None, [], False]
+        if _thread is None:
+            _thread = threading.Thread(target=_run_callbacks, name="fakegpio", daemon=True)
+            _thread.start()
+    if callback is not None:
+        add_event_callback(pin, callback)
+
+def add_event_callback(pin, callback):
+    with _lock:
+        _detect[pin][3].append(callback)
+
+def remove_event_detect(pin):
+    with _lock:
+        _detect.pop(pin, None)
+
+def event_detected(pin):
+    with _lock:
+        detect = _detect.get(pin)
+        if detect is None or not detect[4]:
+            return False
+        detect[4] = False
+        return True
+
+# change an input's level, firing edge detection the way the real driver would
+def set_input(pin, level):
+    now = time.monotonic()
+    with _lock:
+        old = inputs.get(pin, LOW)
+        inputs[pin] = level
+        detect = _detect.get(pin)
+        if detect is None or old == level:
+            return
+        edge, bouncetime, last, callbacks, detected = detect
+        if edge != BOTH and edge != (RISING if level == HIGH else FALLING):
+            return
+        if last is not None and now - last < bouncetime:
+            return
+        detect[2] = now
+        detect[4] = True
+        callbacks = list(callbacks)
+    for callback in callbacks:
+        _callbacks.put((callback, pin))
+
+# a clean button press: high for duration seconds, then low (blocks for duration)
+def press(pin, duration=0.05):
+    set_input(pin, HIGH)
+    time.sleep(duration)
+    set_input(pin, LOW)
+
+def cleanup():
+    with _lock:
+        _detect.clear()
+        outputs.clear()
+        inputs.clear()
@@ -0,0 +1,142 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# silent stand-in for the parts of pygame the show uses (import fakemixer as pygame)
+# nothing is decoded or played, but a channel playing a track reports busy for as long as the real
+# file lasts, so the show's timing on a laptop matches the Pi; durations are read from the mp3 frame headers
+
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# kbps by (mpeg version 1?, layer)
+BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# sample rates by version bits (3 = MPEG 1, 2 = MPEG 2, 0 = MPEG 2.5)
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# what get_init() reports: 44.1 kHz, signed 16 bit, stereo
+FREQUENCY = 44100
+FRAME_BYTES = 4
+BYTES_PER_SECOND = FREQUENCY * FRAME_BYTES
+
+_durations = {}
+
+# seconds of audio in an mp3 file, found by walking its frame headers
+def mp3_duration(path):
+    if path in _durations:
+        return _durations[path]
+    with open(path, "rb") as f:
+        data = f.read()
+    i = 0
+    if data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        i = 10 + size + (10 if data[5] & 0x10 else 0)
+    duration = 0.0
+    while i + 4 <= len(data):
+        if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+            i += 1
+            continue
+        version = (data[i + 1] >> 3) & 3
+        layer = 4 - ((data[i + 1] >> 1) & 3)
+        bitrate_index = data[i + 2] >> 4
+        rate_index = (data[i + 2] >> 2) & 3
+        if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+            i += 1
+            continue
+        mpeg1 = version == 3
+        bitrate = BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+        rate = SAMPLE_RATES[version][rate_index]
+        padding = (data[i + 2] >> 1) & 1
+        if layer == 1:
+            samples = 384
+            length = (12 * bitrate // rate + padding) * 4
+        else:
+            samples = 1152 if mpeg1 or layer == 2 else 576
+            length = samples // 8 * bitrate // rate + padding
+        duration += samples / rate
+        i += length
+    _durations[path] = duration
+    return duration
+
+# a "decoded" track: only its length is known, its samples are silence in the mixer's format
+class Sound:
+    def __init__(self, file=None, buffer=None):
+        if buffer is not None:
+            self.path = "<buffer>"
+            self.length = len(buffer) / float(BYTES_PER_SECOND)
+        else:
+            self.path = file
+            self.length = mp3_duration(file)
+
+    def get_length(self):
+        return self.length
+
+    def get_raw(self):
+        return bytes(int(self.length * FREQUENCY) * FRAME_BYTES)
+
+class Channel:
+    def __init__(self, id):
+        self.id = id
+        self.sound = None
+        self.started = None
+
+    def play(self, sound, loops=0):
+        self.sound = sound
+        self.started = time.monotonic()
+        log.info("playing %s (%.1f s) on channel %d", sound.path, sound.length, self.id)
+
+    def stop(self):
+        self.started = None
+
+    def get_busy(self):
+        if self.started is None:
+            return False
+        if time.monotonic() - self.started >= self.sound.length:
+            self.started = None
+            return False
+        return True
+
+class Mixer:
+    def __init__(self):
+        self.Sound = Sound
+        self.reserved = 0
+        self._channels = {}
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def Channel(self, id):
+        if id not in self._channels:
+            self._channels[id] = Channel(id)
+        return self._channels[id]
+
+    def set_reserved(self, count):
+        self.reserved = count
+        return count
+
+    def get_num_channels(self):
+        return 8
+
+    def get_init(self):
+        return (FREQUENCY, -16, 2)
+
+    def quit(self):
+        for channel in self._channels.values():
+            channel.stop()
+
+mixer = Mixer()
+
+def init():
+    pass
+
+def quit():
+    mixer.quit()
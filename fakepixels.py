@@ -0,0 +1,108 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# in-memory stand-in for neopixel.NeoPixel so the lighting code can run on a laptop
+# the buffers and brightness scaling follow adafruit_pixelbuf, which neopixel.NeoPixel is built on,
+# so frames written here are byte-for-byte what the real strip would transmit
+
+import time
+
+# time a WS2811 chain takes to clock in one pixel at 800 kHz (24 bits x 1.25 us)
+WIRE_TIME_PER_PIXEL = 30e-6
+
+class FakeNeoPixel:
+    # wire_time=True makes show() take as long as sending the frame down a real strand would
+    def __init__(self, n, brightness=1.0, auto_write=False, pixel_order="GRB", wire_time=False):
+        self._pixels = n
+        self.wire_time = wire_time
+        self._bpp = len(pixel_order)
+        self._byteorder_string = pixel_order
+        self._byteorder = tuple(pixel_order.index(c) for c in "RGBW" if c in pixel_order)
+        self._offset = 0
+        self._post_brightness_buffer = bytearray(n * self._bpp)
+        self._pre_brightness_buffer = None
+        self._brightness = 1.0
+        self.auto_write = False
+        self.brightness = brightness
+        self.auto_write = auto_write
+        # copy of the buffer sent by the last show(), and totals for benchmarks
+        self.last_frame = bytes(self._post_brightness_buffer)
+        self.show_count = 0
+        self.bytes_written = 0
+
+    @property
+    def bpp(self):
+        return self._bpp
+
+    @property
+    def byteorder(self):
+        return self._byteorder_string
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        value = min(max(value, 0.0), 1.0)
+        if -0.001 < value - self._brightness < 0.001:
+            return
+        self._brightness = value
+        if self._pre_brightness_buffer is None:
+            self._pre_brightness_buffer = bytearray(self._post_brightness_buffer)
+        for i in range(len(self._post_brightness_buffer)):
+            self._post_brightness_buffer[i] = int(self._pre_brightness_buffer[i] * value)
+        if self.auto_write:
+            self.show()
+
+    def __len__(self):
+        return self._pixels
+
+    def _set_item(self, index, value):
+        if index < 0:
+            index += self._pixels
+        if index >= self._pixels or index < 0:
+            raise IndexError
+        if len(value) == 3 and self._bpp == 4:
+            # like the library, an rgb grey goes to the white channel only
+            if value[0] == value[1] == value[2]:
+                value = (0, 0, 0, value[0])
+            else:
+                value = tuple(value) + (0,)
+        offset = self._offset + index * self._bpp
+        for channel, position in enumerate(self._byteorder):
+            if self._pre_brightness_buffer is not None:
+                self._pre_brightness_buffer[offset + position] = value[channel]
+            self._post_brightness_buffer[offset + position] = int(value[channel] * self._brightness)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            indices = range(*index.indices(self._pixels))
+            if isinstance(value, tuple) and len(value) in (3, 4):
+                for i in indices:
+                    self._set_item(i, value)
+            else:
+                for i, v in zip(indices, value):
+                    self._set_item(i, v)
+        else:
+            self._set_item(index, value)
+        if self.auto_write:
+            self.show()
+
+    def __getitem__(self, index):
+        buffer = self._pre_brightness_buffer
+        if buffer is None:
+            buffer = self._post_brightness_buffer
+        start = self._offset + index * self._bpp
+        return [buffer[start + position] for position in self._byteorder]
+
+    def fill(self, color):
+        self[:] = tuple(color)
+
+    def show(self):
+        if self.wire_time:
+            time.sleep(self._pixels * WIRE_TIME_PER_PIXEL)
+        self.last_frame = bytes(self._post_brightness_buffer)
+        self.show_count += 1
+        self.bytes_written += len(self._post_brightness_buffer)
@@ -0,0 +1,154 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# rendered-once rainbow animations for strawberrycough.py
+# every periodic animation is stored as one contiguous block of wire bytes (brightness applied),
+# so showing a frame is a single slice copy into the NeoPixel transmit buffer
+# blocks are also saved to disk, keyed by the strip configuration, so a restart does not re-render them
+
+import os
+
+import ledframes
+
+# cache files live next to the show script
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ledcache")
+
+# bump when the file layout or the rendering changes so old files are never replayed
+CACHE_VERSION = 1
+
+# one animation: count frames of frame_size bytes each, back to back in block
+class FrameSequence:
+    def __init__(self, block, count, start=0, bpp=3):
+        self.block = block
+        self.count = count
+        self.start = start
+        self.bpp = bpp
+        self.frame_size = len(block) // count
+        self._view = memoryview(block)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def size(self):
+        return len(self.block)
+
+    # frame j as a memoryview into the block, no copy
+    def frame(self, j):
+        j %= self.count
+        return self._view[j * self.frame_size:(j + 1) * self.frame_size]
+
+    # copy frame j into the strip's transmit buffer, the caller still calls strip.show()
+    # only the brightness-applied buffer is written, the unscaled copy the library keeps for
+    # pixels.brightness changes is left alone
+    def render(self, strip, j):
+        post, pre, offset, bpp = ledframes.strip_buffers(strip)
+        first = offset + self.start * bpp
+        post[first:first + self.frame_size] = self.frame(j)
+
+# name of the cache file for one animation and strip configuration
+def cache_key(name, num_pixels, start, order, brightness):
+    return "v%d-%s-%d-%d-%s-%.3f" % (CACHE_VERSION, name, num_pixels, start, order, brightness)
+
+# animations rendered for the current strip configuration
+# entries built for another configuration (length, color order or brightness) are dropped from
+# memory and disk the first time the new configuration is asked for
+class FrameCache:
+    def __init__(self, directory=CACHE_DIR, use_disk=True):
+        self.directory = directory
+        self.use_disk = use_disk
+        self.config = None
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    # total bytes held in memory
+    @property
+    def size(self):
+        return sum(entry.size for entry in self.entries.values())
+
+    # total bytes of cache files on disk
+    def disk_size(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.directory, f)) for f in os.listdir(self.directory))
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "disk_bytes": self.disk_size(),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    # forget everything rendered for a different strip configuration
+    def _check_config(self, config):
+        if config == self.config:
+            return
+        self.config = config
+        self.entries = {}
+        self.prune()
+
+    # delete cache files that do not belong to the current configuration
+    def prune(self):
+        if not self.use_disk or not os.path.isdir(self.directory) or self.config is None:
+            return
+        num_pixels, order, brightness = self.config
+        suffix = "-%s-%.3f" % (order, brightness)
+        for f in os.listdir(self.directory):
+            stem = f[:-len(".bin")] if f.endswith(".bin") else f
+            parts = stem.split("-")
+            current = (
+                f.endswith(".bin")
+                and stem.startswith("v%d-" % CACHE_VERSION)
+                and stem.endswith(suffix)
+                and len(parts) == 6
+                and parts[2] == str(num_pixels)
+            )
+            if not current:
+                os.remove(os.path.join(self.directory, f))
+
+    def _load(self, key, size):
+        path = os.path.join(self.directory, key + ".bin")
+        if not self.use_disk or not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            block = f.read()
+        # a truncated or foreign file is treated as a miss and rewritten
+        if len(block) != size:
+            return None
+        return block
+
+    def _save(self, key, block):
+        if not self.use_disk:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, key + ".bin")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(block)
+        os.replace(tmp, path)
+
+    # all frames of rainbow_cycle (start=10) or rainbow_cycle_questions (start=0) for this strip
+    def rainbow(self, strip, start=0):
+        num_pixels = len(strip)
+        order = strip.byteorder
+        brightness = strip.brightness
+        self._check_config((num_pixels, order, brightness))
+        key = cache_key("rainbow", num_pixels, start, order, brightness)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        frames = ledframes.RainbowFrames(num_pixels, start, order, brightness)
+        size = ledframes.RAINBOW_STEPS * (num_pixels - start) * len(order)
+        block = self._load(key, size)
+        if block is None:
+            block = b"".join(frames.frame(j) for j in range(ledframes.RAINBOW_STEPS))
+            self._save(key, block)
+        entry = FrameSequence(block, ledframes.RAINBOW_STEPS, start, len(order))
+        self.entries[key] = entry
+        return entry
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# privileged LED daemon
+# the NeoPixel driver needs root, the rest of the show does not; this small process is the only
+# one that runs as root: it owns neopixel.NeoPixel and sends whatever frames the (unprivileged)
+# show process writes into a shared-memory ring buffer
+# a show restart no longer re-initializes the DMA strip, and a slow show() can never hold up the
+# show's input handling
+#
+# $ sudo ./leddaemon.py &
+# $ LED_DAEMON=1 ./strawberrycough.py
+#
+# ring layout: HEADER (magic, num_pixels, bpp, slot count) then the sequence number of the newest
+# frame, then SLOTS slots of (8-byte frame sequence number + frame bytes)
+# the writer clears a slot's sequence number, writes the frame, sets the slot's sequence number and
+# then bumps the global one; the reader only uses a slot whose sequence number is the same before
+# and after copying it, so a frame that was overwritten mid-copy is never shown
+
+import logging
+import os
+import signal
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+log = logging.getLogger(__name__)
+
+# name of the shared memory block (/dev/shm/sg-hooked-leds)
+SHM_NAME = "sg-hooked-leds"
+MAGIC = b"SGFB"
+HEADER = struct.Struct("<4sHHI4x")
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = HEADER.size
+DATA_OFFSET = 64
+SLOTS = 4
+# seconds between checks for a new frame
+POLL_INTERVAL = 0.001
+
+def slot_size(num_pixels, bpp):
+    size = SEQUENCE.size + num_pixels * bpp
+    return (size + 7) // 8 * 8
+
+def ring_size(num_pixels, bpp, slots=SLOTS):
+    return DATA_OFFSET + slots * slot_size(num_pixels, bpp)
+
+# the shared frame ring, created by the daemon and attached to by the show
+class FrameRing:
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        magic, self.num_pixels, self.bpp, self.slots = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError("shared memory %s is not an LED frame ring" % shm.name)
+        self.frame_size = self.num_pixels * self.bpp
+        self.slot_size = slot_size(self.num_pixels, self.bpp)
+        self.sequence = SEQUENCE.unpack_from(shm.buf, SEQUENCE_OFFSET)[0]
+
+    # make a new ring, readable and writable by the unprivileged show user
+    @classmethod
+    def create(cls, num_pixels, order="GRB", slots=SLOTS, name=SHM_NAME):
+        bpp = len(order)
+        try:
+            # left over from a daemon that did not shut down cleanly
+            old = shared_memory.SharedMemory(name)
+            old.close()
+            old.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name, create=True, size=ring_size(num_pixels, bpp, slots))
+        os.chmod("/dev/shm/" + name, 0o666)
+        HEADER.pack_into(shm.buf, 0, MAGIC, num_pixels, bpp, slots)
+        SEQUENCE.pack_into(shm.buf, SEQUENCE_OFFSET, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name=SHM_NAME):
+        shm = shared_memory.SharedMemory(name)
+        # python would otherwise remove the daemon's block when the show process exits or restarts
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def _slot(self, sequence):
+        return DATA_OFFSET + (sequence % self.slots) * self.slot_size
+
+    # writer side: publish one frame of wire bytes
+    def write(self, frame):
+        sequence = self.sequence + 1
+        offset = self._slot(sequence)
+        buf = self.shm.buf
+        SEQUENCE.pack_into(buf, offset, 0)
+        buf[offset + SEQUENCE.size:offset + SEQUENCE.size + self.frame_size] = frame
+        SEQUENCE.pack_into(buf, offset, sequence)
+        SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, sequence)
+        self.sequence = sequence
+
+    # reader side: (sequence, frame) of the newest frame after seen, or None
+    def read(self, seen):
+        buf = self.shm.buf
+        sequence = SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)[0]
+        if sequence == seen:
+            return None
+        offset = self._slot(sequence)
+        start = offset + SEQUENCE.size
+        frame = bytes(buf[start:start + self.frame_size])
+        if SEQUENCE.unpack_from(buf, offset)[0] != sequence:
+            # overwritten while copying, the next poll picks up the newer frame
+            return None
+        return sequence, frame
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# strip-like object for the show process: the compositor draws into it as if it were
+# neopixel.NeoPixel, and show() hands the frame to the daemon
+class SharedStrip:
+    def __init__(self, ring, order="GRB"):
+        self.ring = ring
+        self._pixels = ring.num_pixels
+        self._bpp = ring.bpp
+        self._byteorder_string = order
+        self._offset = 0
+        self._post_brightness_buffer = bytearray(ring.frame_size)
+        self._pre_brightness_buffer = None
+        self.brightness = 1.0
+
+    @classmethod
+    def attach(cls, num_pixels, order="GRB", name=SHM_NAME):
+        ring = FrameRing.attach(name)
+        if (ring.num_pixels, ring.bpp) != (num_pixels, len(order)):
+            raise ValueError("LED daemon runs %d pixels x %d bytes, the show wants %d x %d"
+                             % (ring.num_pixels, ring.bpp, num_pixels, len(order)))
+        return cls(ring, order)
+
+    def __len__(self):
+        return self._pixels
+
+    @property
+    def bpp(self):
+        return self._bpp
+
+    @property
+    def byteorder(self):
+        return self._byteorder_string
+
+    def show(self):
+        self.ring.write(self._post_brightness_buffer)
+
+    def deinit(self):
+        self.ring.close()
+
+# daemon main loop: send every new frame from the ring to the strip
+def serve(strip, ring, poll=POLL_INTERVAL):
+    post = strip._post_brightness_buffer
+    offset = strip._offset
+    seen = ring.sequence
+    shown = 0
+    running = [True]
+
+    def stop(signum, frame):
+        running[0] = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while running[0]:
+        latest = ring.read(seen)
+        if latest is None:
+            time.sleep(poll)
+            continue
+        seen, frame = latest
+        post[offset:offset + len(frame)] = frame
+        strip.show()
+        shown += 1
+    log.info("led daemon stopping after %d frames", shown)
+
+if __name__ == "__main__":
+    import board
+    import neopixel
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    # must match strawberrycough.py
+    num_pixels = int(sys.argv[1]) if len(sys.argv) > 1 else 110
+    ORDER = neopixel.GRB
+    # brightness is applied by the show before frames reach the ring
+    pixels = neopixel.NeoPixel(board.D21, num_pixels, brightness=1.0, auto_write=False, pixel_order=ORDER)
+    pixels.fill((0, 0, 0))
+    pixels.show()
+    ring = FrameRing.create(num_pixels, ORDER)
+    log.info("led daemon serving %d pixels on /dev/shm/%s", num_pixels, SHM_NAME)
+    try:
+        serve(pixels, ring)
+    finally:
+        pixels.fill((0, 0, 0))
+        pixels.show()
+        ring.close()
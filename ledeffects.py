@@ -0,0 +1,205 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# time-based LED effects for strawberrycough.py
+# an effect is a generator that draws onto a layer (see ledlayers.py); every frame it is sent the
+# seconds elapsed since it started and draws what should be visible at that moment, so animation
+# speed no longer depends on how long a frame takes or how often frames are drawn
+#
+#     def my_effect(layer, ...):
+#         while True:
+#             t = yield
+#             ...draw for time t...
+#
+# a finite effect simply returns when it is done
+# new effects only need a generator like the one above, no blocking loops
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import ledframes
+import ledtransform
+
+# rainbow speed in palette steps per second, one full cycle is ledframes.RAINBOW_STEPS steps
+RAINBOW_STEPS_PER_SECOND = 100
+
+# a started effect together with the time it started
+class Running:
+    def __init__(self, effect, now):
+        self.effect = effect
+        self.started = now
+        # run up to the first yield, nothing is drawn until the first advance()
+        next(effect)
+
+    # draw the frame for time now, False once the effect has finished
+    def advance(self, now):
+        try:
+            self.effect.send(now - self.started)
+            return True
+        except StopIteration:
+            return False
+
+    def close(self):
+        self.effect.close()
+
+# the rainbow cycles, replays a FrameSequence (see ledcache.py)
+# with rainbow_cycle's sequence it covers the strand only, with rainbow_cycle_questions' it covers everything
+def rainbow(layer, sequence, steps_per_second=RAINBOW_STEPS_PER_SECOND):
+    while True:
+        t = yield
+        # rounded, so a steady frame rate gives a steady step whatever float error t carries
+        layer.blit(sequence.start, sequence.frame(round(t * steps_per_second)))
+
+# brightness levels an audio envelope is quantised to, each one a translate table
+REACTIVE_LEVELS = 32
+# share of full brightness the strand keeps during silence
+REACTIVE_FLOOR = 0.3
+
+_reactive_tables = {}
+
+def reactive_tables(floor=REACTIVE_FLOOR):
+    if floor not in _reactive_tables:
+        _reactive_tables[floor] = [ledtransform.build_table(floor + (1.0 - floor) * n / (REACTIVE_LEVELS - 1))
+                                   for n in range(REACTIVE_LEVELS)]
+    return _reactive_tables[floor]
+
+# the rainbow with its brightness following a track's loudness, started at the same moment as the track
+# envelope has one byte (0 ... 255) per step seconds of audio (see showpcm.py), delay is how long
+# the mixer takes to make a started track audible; after the envelope ends this is the plain rainbow
+# per frame that is one envelope lookup and one bytes.translate of the rainbow frame
+def reactive_rainbow(layer, sequence, envelope, step=0.01, delay=0.0, floor=REACTIVE_FLOOR,
+                     steps_per_second=RAINBOW_STEPS_PER_SECOND):
+    tables = reactive_tables(floor)
+    shift = 8 - (REACTIVE_LEVELS.bit_length() - 1)
+    while True:
+        t = yield
+        frame = sequence.frame(round(t * steps_per_second))
+        i = int((t - delay) / step) if t >= delay else -1
+        if 0 <= i < len(envelope):
+            frame = frame.tobytes().translate(tables[envelope[i] >> shift])
+        layer.blit(sequence.start, frame)
+
+# precomputed theater chase steps, keyed by strip length, segment, color order and color
+_chase_steps = {}
+
+# the chase runs over every whole group of three pixels in the layer's segment,
+# for the 110 pixel booth strip that is pixels 0 ... 107 like the original range(0, 108, 3)
+# returns five (frame bytes, mask) pairs: the first two steps, while pixels not reached yet still
+# show what is underneath, then the three repeating phases
+def chase_steps(layer, color):
+    key = (len(layer), layer.start, layer.stop, layer.byteorder, tuple(color))
+    steps = _chase_steps.get(key)
+    if steps is not None:
+        return steps
+    bpp = layer.bpp
+    count = (layer.stop - layer.start) // 3 * 3
+    lit = ledframes.pack_color(color, layer.byteorder, layer.brightness)
+    dark = bytes(bpp)
+    steps = []
+    for step in range(5):
+        q = step % 3 if step < 2 else step - 2
+        # phases that were lit in the last one or two steps have been cleared again
+        cleared = [(q - back) % 3 for back in range(1, min(step, 2) + 1)]
+        frame = bytearray(count * bpp)
+        mask = bytearray(count)
+        for i in range(count):
+            if i % 3 == q:
+                frame[i * bpp:(i + 1) * bpp] = lit
+                mask[i] = 1
+            elif i % 3 in cleared:
+                frame[i * bpp:(i + 1) * bpp] = dark
+                mask[i] = 1
+        steps.append((bytes(frame), bytes(mask)))
+    _chase_steps[key] = steps
+    return steps
+
+# fun effect for emphasis: every third light on, stepping along the layer's segment every wait_ms
+# pixels that have been lit once go dark afterwards, pixels not reached yet show what is underneath
+# each step is a single masked copy of a precomputed frame
+def theater_chase(layer, color, wait_ms=50, iterations=10):
+    frames = chase_steps(layer, color)
+    steps = iterations * 3
+    shown = -1
+    while True:
+        t = yield
+        step = int(t * 1000.0 / wait_ms)
+        if step >= steps:
+            return
+        if step == shown:
+            continue
+        shown = step
+        frame, mask = frames[step if step < 2 else 2 + step % 3]
+        layer.blit(layer.start, frame, mask)
+
+# replay a recorded animation (see ledrecord.py) at its original pace, nothing is re-rendered
+# the recording must be for a strip of the same length as the layer
+def playback(layer, recording, loop=False):
+    duration = recording.duration
+    while True:
+        t = yield
+        if t > duration:
+            if not loop:
+                return
+            t = t % duration if duration else 0.0
+        layer.blit(0, recording.frame(recording.index_at(t)))
+
+# a single solid color, e.g. for blending towards black
+def solid(layer, color):
+    layer.fill(color)
+    while True:
+        yield
+
+# per-byte mix of two frames, amount 0.0 is all a and 1.0 is all b
+def mix(a, b, amount):
+    if numpy is not None:
+        x = numpy.frombuffer(a, dtype=numpy.uint8).astype(numpy.float32)
+        y = numpy.frombuffer(b, dtype=numpy.uint8).astype(numpy.float32)
+        return (x + (y - x) * amount).astype(numpy.uint8).tobytes()
+    return bytes([int(p + (q - p) * amount) for p, q in zip(a, b)])
+
+# run two effects side by side on offscreen layers and draw a blend of them
+# make_a and make_b build the effects for a given layer, e.g. lambda l: rainbow(l, sequence)
+# amount is a number or a function of time returning 0.0 ... 1.0
+def blend(layer, make_a, make_b, amount=0.5):
+    a = layer.offscreen()
+    b = layer.offscreen()
+    effect_a = make_a(a)
+    effect_b = make_b(b)
+    next(effect_a)
+    next(effect_b)
+    first = layer.start * layer.bpp
+    last = layer.stop * layer.bpp
+    while True:
+        t = yield
+        x = amount(t) if callable(amount) else amount
+        try:
+            effect_a.send(t)
+            effect_b.send(t)
+        except StopIteration:
+            return
+        layer.blit(layer.start, mix(a.buf[first:last], b.buf[first:last], x))
+
+# fade from effect a to effect b over duration seconds, then keep running b on its own
+def crossfade(layer, make_a, make_b, duration=1.0):
+    fading = blend(layer, make_a, make_b, lambda t: min(t / duration, 1.0))
+    next(fading)
+    while True:
+        t = yield
+        if t >= duration:
+            break
+        try:
+            fading.send(t)
+        except StopIteration:
+            return
+    fading.close()
+    effect = make_b(layer)
+    next(effect)
+    while True:
+        try:
+            effect.send(t)
+        except StopIteration:
+            return
+        t = yield
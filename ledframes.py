@@ -0,0 +1,127 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# precomputed rainbow frames for strawberrycough.py
+# the 256 colors of wheel() are computed once into a palette that is already in wire order
+# (GRB etc.) with brightness applied, so every frame is a single table lookup over an index
+# vector that is copied straight into the NeoPixel transmit buffer
+
+# numpy is used when it is installed on the Pi, otherwise a plain python gather is used
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# number of frames in one rainbow cycle, matches range(255) in the original loops
+RAINBOW_STEPS = 255
+
+# Input a value 0 to 255 to get a color value.
+# The colours are a transition r - g - b - back to r.
+def wheel(pos):
+    if pos < 0 or pos > 255:
+        r = g = b = 0
+    elif pos < 85:
+        r = int(pos * 3)
+        g = int(255 - pos * 3)
+        b = 0
+    elif pos < 170:
+        pos -= 85
+        r = int(255 - pos * 3)
+        g = 0
+        b = int(pos * 3)
+    else:
+        pos -= 170
+        r = 0
+        g = int(pos * 3)
+        b = int(255 - pos * 3)
+    return (r, g, b)
+
+# 256 wheel() colors packed in wire order, scaled the same way the neopixel library scales
+# every channel on assignment i.e. int(value * brightness)
+def build_palette(order="GRB", brightness=1.0):
+    bpp = len(order)
+    palette = bytearray(256 * bpp)
+    for pos in range(256):
+        r, g, b = wheel(pos)
+        channels = {"R": r, "G": g, "B": b, "W": 0}
+        for c, name in enumerate(order):
+            palette[pos * bpp + c] = int(channels[name] * brightness)
+    return bytes(palette)
+
+# one (r, g, b) or (r, g, b, w) color as wire bytes, the same way the neopixel library stores it
+# (an rgb grey on an RGBW strip is sent on the white channel only)
+def pack_color(color, order="GRB", brightness=1.0):
+    r, g, b = color[0], color[1], color[2]
+    w = color[3] if len(color) > 3 else 0
+    if len(order) == 4 and len(color) == 3 and r == g == b:
+        r = g = b = 0
+        w = color[0]
+    channels = {"R": r, "G": g, "B": b, "W": w}
+    return bytes(int(channels[name] * brightness) for name in order)
+
+# returns (transmit buffer, pre-brightness buffer or None, byte offset of pixel 0, bytes per pixel)
+# these are the internals of adafruit_pixelbuf, which neopixel.NeoPixel is built on
+def strip_buffers(strip):
+    return (
+        strip._post_brightness_buffer,
+        strip._pre_brightness_buffer,
+        strip._offset,
+        strip.bpp,
+    )
+
+# all 255 frames of a rainbow over pixels[start ... num_pixels-1]
+# start=10 is rainbow_cycle (strand only), start=0 is rainbow_cycle_questions (strand + indicators)
+class RainbowFrames:
+    def __init__(self, num_pixels, start=0, order="GRB", brightness=1.0):
+        self.num_pixels = num_pixels
+        self.start = start
+        self.order = order
+        self.brightness = brightness
+        self.bpp = len(order)
+        count = num_pixels - start
+        # same index math as the original loop, without the per-frame offset j
+        self.base = [i * 256 // count for i in range(start, num_pixels)]
+        self.palette = build_palette(order, brightness)
+        # the library keeps an unscaled copy of every pixel when brightness < 1.0
+        self.raw_palette = build_palette(order) if brightness < 1.0 else self.palette
+        if numpy is not None:
+            self._base = numpy.array(self.base, dtype=numpy.intp)
+            self._palette = numpy.frombuffer(self.palette, dtype=numpy.uint8).reshape(256, self.bpp)
+            self._raw_palette = numpy.frombuffer(self.raw_palette, dtype=numpy.uint8).reshape(256, self.bpp)
+        else:
+            self._entries = [self.palette[k * self.bpp:(k + 1) * self.bpp] for k in range(256)]
+            self._raw_entries = [self.raw_palette[k * self.bpp:(k + 1) * self.bpp] for k in range(256)]
+
+    # build the frame for the same strip settings as an existing NeoPixel object
+    @classmethod
+    def for_strip(cls, strip, start=0):
+        return cls(len(strip), start, strip.byteorder, strip.brightness)
+
+    def __len__(self):
+        return RAINBOW_STEPS
+
+    # wire bytes for step j (brightness applied)
+    def frame(self, j):
+        if numpy is not None:
+            return self._palette[(self._base + j) & 255].tobytes()
+        entries = self._entries
+        return b"".join([entries[(b + j) & 255] for b in self.base])
+
+    # write step j straight into the strip's buffers, the caller still calls strip.show()
+    def render(self, strip, j):
+        post, pre, offset, bpp = strip_buffers(strip)
+        first = offset + self.start * bpp
+        last = first + len(self.base) * bpp
+        if numpy is not None:
+            index = (self._base + j) & 255
+            numpy.take(self._palette, index, axis=0,
+                       out=numpy.frombuffer(post, dtype=numpy.uint8)[first:last].reshape(-1, bpp))
+            if pre is not None:
+                numpy.take(self._raw_palette, index, axis=0,
+                           out=numpy.frombuffer(pre, dtype=numpy.uint8)[first:last].reshape(-1, bpp))
+        else:
+            post[first:last] = self.frame(j)
+            if pre is not None:
+                entries = self._raw_entries
+                pre[first:last] = b"".join([entries[(b + j) & 255] for b in self.base])
@@ -0,0 +1,225 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# segment-aware LED compositor for strawberrycough.py
+# the strip is split into named segments (question indicators, strand) and drawn as a stack of
+# layers, e.g. "effects" over "indicators" over "rainbow"
+# each layer remembers which pixels changed since the last frame; only that region is recomposited,
+# and when the composed frame is the same as the one last pushed, strip.show() is skipped entirely
+# layers hold full-brightness colors, brightness and gamma are applied on the way out (see ledtransform.py)
+
+import ledframes
+import ledtransform
+
+# one drawing surface, the same length as the strip so effects can keep using strip indices
+# an opaque layer covers its whole segment, a transparent layer only covers the pixels drawn on it
+# pixel values are stored as wire bytes, in the same channel order as the NeoPixel transmit buffer
+class Layer:
+    def __init__(self, name, start, stop, z, num_pixels, order="GRB", brightness=1.0, opaque=False):
+        self.name = name
+        self.start = start
+        self.stop = stop
+        self.z = z
+        self.num_pixels = num_pixels
+        self.order = order
+        self._brightness = brightness
+        self._bpp = len(order)
+        self.opaque = opaque
+        self.buf = bytearray(num_pixels * self._bpp)
+        self.mask = None if opaque else bytearray(num_pixels)
+        self.visible = True
+        # dirty pixel range [lo, hi) since the last compose, None when clean
+        self.dirty = None
+
+    # strip-like attributes so frame caches and effects can treat a layer like neopixel.NeoPixel
+    def __len__(self):
+        return self.num_pixels
+
+    @property
+    def bpp(self):
+        return self._bpp
+
+    @property
+    def byteorder(self):
+        return self.order
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    def mark(self, lo, hi):
+        lo = max(lo, self.start)
+        hi = min(hi, self.stop)
+        if lo >= hi:
+            return
+        if self.dirty is None:
+            self.dirty = (lo, hi)
+        else:
+            self.dirty = (min(lo, self.dirty[0]), max(hi, self.dirty[1]))
+
+    def __setitem__(self, index, color):
+        if index < 0:
+            index += self.num_pixels
+        if index < self.start or index >= self.stop:
+            raise IndexError("pixel %d is outside layer %s" % (index, self.name))
+        bpp = self._bpp
+        self.buf[index * bpp:(index + 1) * bpp] = ledframes.pack_color(color, self.order, self._brightness)
+        if self.mask is not None:
+            self.mask[index] = 1
+        self.mark(index, index + 1)
+
+    def fill(self, color):
+        packed = ledframes.pack_color(color, self.order, self._brightness)
+        count = self.stop - self.start
+        self.buf[self.start * self._bpp:self.stop * self._bpp] = packed * count
+        if self.mask is not None:
+            self.mask[self.start:self.stop] = b"\x01" * count
+        self.mark(self.start, self.stop)
+
+    # copy ready-made wire bytes (e.g. a cached rainbow frame) starting at pixel start
+    # mask (one byte per pixel, 1 = drawn) leaves the other pixels of a transparent layer see-through
+    def blit(self, start, data, mask=None):
+        bpp = self._bpp
+        stop = start + len(data) // bpp
+        self.buf[start * bpp:stop * bpp] = data
+        if self.mask is not None:
+            self.mask[start:stop] = b"\x01" * (stop - start) if mask is None else mask
+        self.mark(start, stop)
+
+    # make the whole layer see-through again (opaque layers go black)
+    def clear(self):
+        count = self.stop - self.start
+        self.buf[self.start * self._bpp:self.stop * self._bpp] = bytes(count * self._bpp)
+        if self.mask is not None:
+            self.mask[self.start:self.stop] = bytes(count)
+        self.mark(self.start, self.stop)
+
+    # an opaque scratch layer of the same shape that is not part of any compositor, for blending
+    def offscreen(self):
+        return Layer(self.name, self.start, self.stop, self.z, self.num_pixels, self.order,
+                     self._brightness, opaque=True)
+
+    def show(self):
+        self.visible = True
+        self.mark(self.start, self.stop)
+
+    def hide(self):
+        self.visible = False
+        self.mark(self.start, self.stop)
+
+# the strip should be created with brightness=1.0, the transform does the dimming
+class Compositor:
+    def __init__(self, strip, segments, transform=None):
+        self.strip = strip
+        self.num_pixels = len(strip)
+        self.order = strip.byteorder
+        self.bpp = strip.bpp
+        self.transform = transform or ledtransform.Transform(self.order)
+        # set when every pixel has to be resent, e.g. after a brightness change
+        self.stale = False
+        # optional ledrecord.FrameRecorder that gets every pushed frame
+        self.recorder = None
+        # name -> (first pixel, one past the last pixel)
+        self.segments = dict(segments)
+        self.layers = []
+        self._by_name = {}
+        self.frame = bytearray(self.num_pixels * self.bpp)
+        self.pushes = 0
+        self.skipped = 0
+
+    def add_layer(self, name, segment, z, opaque=False):
+        start, stop = self.segments[segment]
+        layer = Layer(name, start, stop, z, self.num_pixels, self.order, 1.0, opaque)
+        self.layers.append(layer)
+        self.layers.sort(key=lambda l: l.z)
+        self._by_name[name] = layer
+        return layer
+
+    def layer(self, name):
+        return self._by_name[name]
+
+    # only the output table is rebuilt, the layers are untouched
+    def set_brightness(self, brightness):
+        self.transform.set_brightness(brightness)
+        self.stale = True
+
+    def set_gamma(self, gamma):
+        self.transform.set_gamma(gamma)
+        self.stale = True
+
+    # repaint pixels [lo, hi) of the frame from every visible layer, bottom to top
+    def _paint(self, lo, hi):
+        bpp = self.bpp
+        frame = self.frame
+        frame[lo * bpp:hi * bpp] = bytes((hi - lo) * bpp)
+        for layer in self.layers:
+            if not layer.visible:
+                continue
+            a = max(lo, layer.start)
+            b = min(hi, layer.stop)
+            if a >= b:
+                continue
+            if layer.mask is None:
+                frame[a * bpp:b * bpp] = layer.buf[a * bpp:b * bpp]
+                continue
+            mask = layer.mask
+            i = mask.find(1, a, b)
+            while i != -1:
+                # copy each run of drawn pixels in one slice
+                j = mask.find(0, i, b)
+                if j == -1:
+                    j = b
+                frame[i * bpp:j * bpp] = layer.buf[i * bpp:j * bpp]
+                i = mask.find(1, j, b) if j < b else -1
+
+    # recomposite the dirty region, returns the pixel range [lo, hi) that changed or None
+    def compose(self):
+        lo = hi = None
+        for layer in self.layers:
+            if layer.dirty is None:
+                continue
+            if lo is None:
+                lo, hi = layer.dirty
+            else:
+                lo = min(lo, layer.dirty[0])
+                hi = max(hi, layer.dirty[1])
+            layer.dirty = None
+        if lo is None:
+            return None
+        bpp = self.bpp
+        before = bytes(self.frame[lo * bpp:hi * bpp])
+        self._paint(lo, hi)
+        if self.frame[lo * bpp:hi * bpp] == before:
+            return None
+        return (lo, hi)
+
+    # compose and copy the changed region through the output table into the transmit buffer
+    # returns False when nothing changed and show() can be skipped
+    def prepare(self):
+        region = self.compose()
+        if self.stale:
+            region = (0, self.num_pixels)
+            self.stale = False
+        if region is None:
+            self.skipped += 1
+            return False
+        post, pre, offset, bpp = ledframes.strip_buffers(self.strip)
+        first = region[0] * bpp
+        last = region[1] * bpp
+        post[offset + first:offset + last] = self.transform.apply(self.frame[first:last])
+        return True
+
+    # send a prepared frame to the strip
+    def show(self):
+        self.strip.show()
+        if self.recorder is not None:
+            self.recorder.record(self.frame, brightness=self.transform.brightness, gamma=self.transform.gamma)
+        self.pushes += 1
+
+    # compose and send the frame to the strip, skipping show() when nothing changed
+    def push(self):
+        if not self.prepare():
+            return False
+        self.show()
+        return True
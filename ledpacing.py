@@ -0,0 +1,116 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# frame pacing for the LED render thread
+# instead of a fixed sleep after every pixels.show(), each frame gets a time budget of 1/fps;
+# render time and show() time are measured and only what is left of the budget is slept
+# the last WINDOW frames are kept for rolling p50/p95/p99 timings, read with stats() or logged
+# every LOG_INTERVAL seconds, to see how close the Pi is to saturation as the strand gets longer
+
+import collections
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# number of frames the percentiles are computed over
+WINDOW = 600
+# seconds between timing log lines, 0 to turn logging off
+LOG_INTERVAL = 60.0
+
+# value at fraction p (0.0 ... 1.0) of an already sorted list
+def percentile(values, p):
+    if not values:
+        return 0.0
+    return values[min(int(p * len(values)), len(values) - 1)]
+
+class FramePacer:
+    def __init__(self, fps, window=WINDOW, log_interval=LOG_INTERVAL):
+        self.fps = fps
+        self.budget = 1.0 / fps
+        self.log_interval = log_interval
+        self._lock = threading.Lock()
+        self.render_times = collections.deque(maxlen=window)
+        self.show_times = collections.deque(maxlen=window)
+        self.frame_times = collections.deque(maxlen=window)
+        self.frames = 0
+        self.shows = 0
+        self.dropped = 0
+        self.started = None
+        self.deadline = None
+        self._frame_start = None
+        self._render_end = None
+        self._show_time = 0.0
+        self._last_log = None
+
+    # call at the start of every frame
+    def begin(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.started is None:
+            self.started = now
+            self.deadline = now
+            self._last_log = now
+        self._frame_start = now
+        self._show_time = 0.0
+        return now
+
+    # call when the frame is drawn and ready to send
+    def rendered(self):
+        self._render_end = time.monotonic()
+
+    # call around strip.show() with its duration; frames without a show() skip this
+    def shown(self, duration):
+        self._show_time = duration
+
+    # call at the end of the frame, returns seconds left until the next frame should start
+    def end(self):
+        now = time.monotonic()
+        frame_time = now - self._frame_start
+        render_time = (self._render_end or now) - self._frame_start
+        with self._lock:
+            self.frames += 1
+            self.render_times.append(render_time)
+            self.frame_times.append(frame_time)
+            if self._show_time:
+                self.shows += 1
+                self.show_times.append(self._show_time)
+            self.deadline += self.budget
+            if now > self.deadline:
+                # over budget: the missed slots are dropped instead of bursting to catch up
+                self.dropped += int((now - self.deadline) / self.budget) + 1
+                self.deadline = now
+        self._render_end = None
+        if self.log_interval and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            log.info(self.summary())
+        return max(0.0, self.deadline - now)
+
+    def stats(self):
+        with self._lock:
+            frame_times = sorted(self.frame_times)
+            render_times = sorted(self.render_times)
+            show_times = sorted(self.show_times)
+            elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+            result = {
+                "target_fps": self.fps,
+                "fps": self.frames / elapsed if elapsed else 0.0,
+                "frames": self.frames,
+                "shows": self.shows,
+                "dropped": self.dropped,
+                "budget_ms": 1000.0 * self.budget,
+            }
+        for name, values in (("frame", frame_times), ("render", render_times), ("show", show_times)):
+            for p in (50, 95, 99):
+                result["%s_p%d_ms" % (name, p)] = 1000.0 * percentile(values, p / 100.0)
+            result["%s_max_ms" % name] = 1000.0 * (values[-1] if values else 0.0)
+        return result
+
+    # one line for the log
+    def summary(self):
+        s = self.stats()
+        return ("led frames: %.1f/%d fps, frame p50 %.2f p95 %.2f p99 %.2f ms (budget %.2f), "
+                "render p95 %.2f ms, show() p95 %.2f ms, %d dropped"
+                % (s["fps"], s["target_fps"], s["frame_p50_ms"], s["frame_p95_ms"], s["frame_p99_ms"],
+                   s["budget_ms"], s["render_p95_ms"], s["show_p95_ms"], s["dropped"]))
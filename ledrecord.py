@@ -0,0 +1,198 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# frame recorder and player for the LED compositor
+# every frame the compositor pushes to the strip can be appended to a memory-mapped file, with a
+# timestamp, and streamed back later into the real strip or the fake one without re-rendering
+# anything, e.g. for visual regression diffs of the effects or for canned animations
+#
+# file layout: one HEADER_SIZE byte header, then fixed-size records of
+# 8-byte timestamp (seconds since recording started, float), 8-byte brightness and 8-byte gamma
+# (floats) + num_pixels * bpp frame bytes
+# frames are stored before the brightness/gamma table is applied; each record keeps the table
+# settings it was sent with, since the show changes the brightness at runtime, and the header
+# keeps the ones in effect when the recording started
+#
+# $ python3 ledrecord.py info show.rec
+# $ python3 ledrecord.py diff before.rec after.rec
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+import time
+
+import ledframes
+import ledtransform
+
+MAGIC = b"SGLR"
+VERSION = 2
+# magic, version, color order, num_pixels, bpp, brightness, gamma, record count
+HEADER = struct.Struct("<4sH4sHHddQ")
+HEADER_SIZE = 64
+# timestamp, brightness, gamma
+RECORD_HEAD = struct.Struct("<ddd")
+# the file grows by this many records at a time
+GROW_RECORDS = 1024
+
+class FrameRecorder:
+    def __init__(self, path, num_pixels, order="GRB", brightness=1.0, gamma=ledtransform.DEFAULT_GAMMA):
+        self.path = path
+        self.num_pixels = num_pixels
+        self.order = order
+        self.bpp = len(order)
+        self.brightness = brightness
+        self.gamma = gamma
+        self.frame_size = num_pixels * self.bpp
+        self.record_size = RECORD_HEAD.size + self.frame_size
+        self.count = 0
+        self.capacity = GROW_RECORDS
+        self.started = time.monotonic()
+        self._file = open(path, "w+b")
+        self._file.truncate(HEADER_SIZE + self.capacity * self.record_size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._write_header()
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.order.encode().ljust(4, b"\0"),
+                         self.num_pixels, self.bpp, self.brightness, self.gamma, self.count)
+
+    def _grow(self):
+        self._map.flush()
+        self._map.close()
+        self.capacity *= 2
+        self._file.truncate(HEADER_SIZE + self.capacity * self.record_size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    # append one frame, t defaults to the time since the recorder was created and brightness and
+    # gamma to the ones the recorder was created with
+    def record(self, frame, t=None, brightness=None, gamma=None):
+        if self.count == self.capacity:
+            self._grow()
+        if t is None:
+            t = time.monotonic() - self.started
+        offset = HEADER_SIZE + self.count * self.record_size
+        RECORD_HEAD.pack_into(self._map, offset, t, self.brightness if brightness is None else brightness,
+                              self.gamma if gamma is None else gamma)
+        self._map[offset + RECORD_HEAD.size:offset + self.record_size] = frame
+        self.count += 1
+        # the count in the header only covers complete records, so a crash leaves a readable file
+        self._write_header()
+
+    # trim the unused space and close the file
+    def close(self):
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        self._file.truncate(HEADER_SIZE + self.count * self.record_size)
+        self._file.close()
+
+class FrameRecording:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, order, num_pixels, bpp, brightness, gamma, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a version %d frame recording" % (path, VERSION))
+        self.order = order.rstrip(b"\0").decode()
+        self.num_pixels = num_pixels
+        self.bpp = bpp
+        self.brightness = brightness
+        self.gamma = gamma
+        self.count = count
+        self.frame_size = num_pixels * bpp
+        self.record_size = RECORD_HEAD.size + self.frame_size
+        self._view = memoryview(self._map)
+        heads = [RECORD_HEAD.unpack_from(self._map, HEADER_SIZE + i * self.record_size) for i in range(count)]
+        self.timestamps = [head[0] for head in heads]
+        # (brightness, gamma) each frame was sent with
+        self.levels = [head[1:] for head in heads]
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def duration(self):
+        return self.timestamps[-1] if self.count else 0.0
+
+    # frame i as a memoryview into the file, no copy
+    def frame(self, i):
+        offset = HEADER_SIZE + i * self.record_size + RECORD_HEAD.size
+        return self._view[offset:offset + self.frame_size]
+
+    # output transform frame i was sent with
+    def transform(self, i):
+        brightness, gamma = self.levels[i]
+        return ledtransform.Transform(self.order, brightness, gamma)
+
+    # index of the frame on screen at time t
+    def index_at(self, t):
+        return max(bisect.bisect_right(self.timestamps, t) - 1, 0)
+
+    # stream the recording into a strip (real or fake) at its original pace, blocking
+    # each frame goes out at the brightness and gamma it was recorded with, unless a transform is given
+    def play(self, strip, transform=None, speed=1.0):
+        post, pre, offset, bpp = ledframes.strip_buffers(strip)
+        level = None
+        started = time.monotonic()
+        for i in range(self.count):
+            wait = started + self.timestamps[i] / speed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if self.levels[i] != level:
+                level = self.levels[i]
+                output = transform or self.transform(i)
+            post[offset:offset + self.frame_size] = output.apply(self.frame(i))
+            strip.show()
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+# first frames that differ between two recordings, as (frame index, [changed pixel indices])
+# timestamps are ignored, frames are compared in order; frames recorded at different brightness or
+# gamma are compared as they were sent to the strip
+def diff(a, b, limit=10):
+    changes = []
+    for i in range(min(len(a), len(b))):
+        x = a.frame(i)
+        y = b.frame(i)
+        if a.levels[i] != b.levels[i]:
+            x = a.transform(i).apply(x)
+            y = b.transform(i).apply(y)
+        if x == y:
+            continue
+        pixels = [p for p in range(a.num_pixels) if x[p * a.bpp:(p + 1) * a.bpp] != y[p * b.bpp:(p + 1) * b.bpp]]
+        changes.append((i, pixels))
+        if len(changes) >= limit:
+            break
+    return changes
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "info":
+        recording = FrameRecording(sys.argv[2])
+        changes = sum(1 for x, y in zip(recording.levels, recording.levels[1:]) if x != y)
+        print("%s: %d frames of %d %s pixels over %.2f s, brightness %.2f, gamma %.2f, %d level changes (%d bytes)"
+              % (recording.path, len(recording), recording.num_pixels, recording.order, recording.duration,
+                 recording.brightness, recording.gamma, changes, os.path.getsize(recording.path)))
+    elif len(sys.argv) == 4 and sys.argv[1] == "diff":
+        a = FrameRecording(sys.argv[2])
+        b = FrameRecording(sys.argv[3])
+        if (a.num_pixels, a.order) != (b.num_pixels, b.order):
+            sys.exit("recordings are for different strips")
+        changes = diff(a, b)
+        if len(a) != len(b):
+            print("frame counts differ: %d vs %d" % (len(a), len(b)))
+        for i, pixels in changes:
+            print("frame %d: %d pixels differ, first %s" % (i, len(pixels), pixels[:10]))
+        if changes or len(a) != len(b):
+            sys.exit(1)
+        print("%d frames identical" % len(a))
+    else:
+        sys.exit("usage: ledrecord.py info FILE | diff FILE FILE")
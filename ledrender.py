@@ -0,0 +1,159 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# fixed-rate LED render thread for strawberrycough.py
+# the thread is the only code that touches the strip; the show logic hands it commands through a
+# queue and never waits for an animation to finish, so button checks, audio and timers keep running
+#
+# effects are the time-based generators from ledeffects.py, drawing onto compositor layers
+# (see ledlayers.py); every frame the render thread sends each effect its elapsed time and then
+# pushes the composed frame, skipping show() when nothing changed
+# a looping effect (e.g. a rainbow) runs in the background, a finite effect (e.g. a theater chase)
+# plays over it once, its layer is cleared, and the background picks up again when it ends
+
+import queue
+import threading
+import time
+
+import ledeffects
+import ledpacing
+
+# frames per second the render thread aims for
+DEFAULT_FPS = 100
+
+class RenderLoop(threading.Thread):
+    def __init__(self, compositor, fps=DEFAULT_FPS):
+        super().__init__(name="ledrender", daemon=True)
+        self.compositor = compositor
+        self.fps = fps
+        self.commands = queue.Queue()
+        self.background = None
+        # name of the last background asked for, so callers can avoid restarting the same effect
+        self.background_name = None
+        self.overlay = None
+        self.overlay_layer = None
+        # called once with the time the next frame is on the strip, see play()
+        self.on_shown = None
+        self.running = False
+        # frame budget and timing stats (see ledpacing.py)
+        self.pacer = ledpacing.FramePacer(fps)
+
+    # commands, safe to call from any thread; they take effect at the start of the next frame
+
+    # replace the looping background effect
+    def loop(self, effect, name=None):
+        self.background_name = name
+        self.commands.put(("loop", effect))
+
+    # play a finite effect once over the background, layer (by name) is cleared when it ends
+    # on_shown is called from the render thread with the time its first frame was sent to the strip
+    def play(self, effect, layer=None, on_shown=None):
+        self.commands.put(("play", effect, layer, on_shown))
+
+    # set a single pixel on a layer, e.g. a question indicator; it stays until changed again
+    def set_pixel(self, layer, index, color):
+        self.commands.put(("pixel", layer, index, color))
+
+    # change the global brightness (0.0 ... 1.0) without touching any effect
+    def set_brightness(self, brightness):
+        self.commands.put(("brightness", brightness))
+
+    # blank every layer and drop any effects
+    def clear(self):
+        self.background_name = None
+        self.commands.put(("clear",))
+
+    def stop(self, timeout=1.0):
+        self.commands.put(("stop",))
+        if self.is_alive():
+            self.join(timeout)
+
+    # rolling frame, render and show() timings plus push counts
+    def stats(self):
+        result = self.pacer.stats()
+        result["pushes"] = self.compositor.pushes
+        result["skipped"] = self.compositor.skipped
+        return result
+
+    def _handle(self, command):
+        name = command[0]
+        if name == "loop":
+            if self.background is not None:
+                self.background.close()
+            self.background = ledeffects.Running(command[1], time.monotonic())
+        elif name == "play":
+            self._end_overlay()
+            self.overlay = ledeffects.Running(command[1], time.monotonic())
+            self.overlay_layer = command[2]
+            self.on_shown = command[3]
+        elif name == "brightness":
+            self.compositor.set_brightness(command[1])
+        elif name == "pixel":
+            self.compositor.layer(command[1])[command[2]] = command[3]
+        elif name == "clear":
+            if self.background is not None:
+                self.background.close()
+            self.background = None
+            self._end_overlay()
+            for layer in self.compositor.layers:
+                layer.clear()
+        elif name == "stop":
+            self.running = False
+
+    def _drain(self):
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            self._handle(command)
+
+    def _end_overlay(self):
+        if self.overlay is not None:
+            self.overlay.close()
+        if self.overlay_layer is not None:
+            self.compositor.layer(self.overlay_layer).clear()
+        self.overlay = None
+        self.overlay_layer = None
+
+    # draw the current effect for time now
+    # the background is held still while a one-shot effect plays over it
+    def _step(self, now):
+        if self.overlay is not None:
+            if self.overlay.advance(now):
+                return
+            self._end_overlay()
+        if self.background is not None and not self.background.advance(now):
+            self.background = None
+
+    def run(self):
+        self.running = True
+        pacer = self.pacer
+        while True:
+            begin = pacer.begin()
+            self._drain()
+            if not self.running:
+                break
+            self._step(begin)
+            changed = self.compositor.prepare()
+            pacer.rendered()
+            if changed:
+                shown = time.monotonic()
+                self.compositor.show()
+                pacer.shown(time.monotonic() - shown)
+            if self.on_shown is not None:
+                # the played effect's first frame is on the strip now (or already was, if it changed nothing)
+                on_shown, self.on_shown = self.on_shown, None
+                on_shown(time.monotonic())
+            # sleep only for what is left of this frame's budget, waking early if a command arrives
+            left = pacer.end()
+            if not left:
+                continue
+            try:
+                command = self.commands.get(timeout=left)
+            except queue.Empty:
+                continue
+            # a command is drawn at once: the next frame starts now and handles whatever else was
+            # queued with it; that frame takes the next slot, so the frame rate does not go up
+            self._handle(command)
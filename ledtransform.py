@@ -0,0 +1,43 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# output transform for the LED compositor
+# colors are drawn at full brightness in wire order (the palettes in ledframes.py already bake in
+# the GRB/RGB channel order); brightness and a gamma curve are baked into one 256-entry table that
+# is applied to the finished frame with bytes.translate right before it is sent to the strip
+# changing brightness at runtime only rebuilds the table
+
+# 1.0 keeps today's linear look, 2.2 - 2.8 gives perceptually even fades and dimming
+DEFAULT_GAMMA = 1.0
+
+# value -> output byte for every channel, brightness applied the same way the neopixel library
+# applies it (int(value * brightness)) so a gamma of 1.0 matches its output exactly
+def build_table(brightness=1.0, gamma=DEFAULT_GAMMA):
+    brightness = min(max(brightness, 0.0), 1.0)
+    table = bytearray(256)
+    for v in range(256):
+        level = v if gamma == 1.0 else 255.0 * (v / 255.0) ** gamma
+        table[v] = int(level * brightness)
+    return bytes(table)
+
+class Transform:
+    def __init__(self, order="GRB", brightness=1.0, gamma=DEFAULT_GAMMA):
+        self.order = order
+        self.brightness = brightness
+        self.gamma = gamma
+        self.table = build_table(brightness, gamma)
+
+    def set_brightness(self, brightness):
+        self.brightness = min(max(brightness, 0.0), 1.0)
+        self.table = build_table(self.brightness, self.gamma)
+
+    def set_gamma(self, gamma):
+        self.gamma = gamma
+        self.table = build_table(self.brightness, self.gamma)
+
+    # full-brightness wire bytes -> bytes to send
+    def apply(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return data.translate(self.table)
@@ -0,0 +1,158 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# decoded audio for the show
+# instead of pygame.mixer.music.load() opening and decoding an mp3 at the moment a guest should hear
+# it, every track is decoded once into a pygame.mixer.Sound, in a background thread at startup, and
+# kept in memory; play() then only hands the buffer to the mixer
+# the cache has a memory budget, the least recently played tracks are dropped when it is exceeded
+# (and decoded again the next time they are needed)
+# with a showpcm.PcmCache the decoded samples also go to disk, so after a restart "decoding" a
+# track is only reading its cached samples back, and preloading also loads the tracks' loudness
+# envelopes
+
+import collections
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# bytes of decoded audio kept in memory
+MEMORY_BUDGET = 32 * 1024 * 1024
+
+# reserved mixer channel for each kind of audio: narration, short effects and background sound,
+# so starting one never stops or replaces another
+CHANNELS = {"voice": 0, "sfx": 1, "ambience": 2}
+
+class SoundCache:
+    # pcm is an optional showpcm.PcmCache for the same directory
+    def __init__(self, pygame, directory=".", budget=MEMORY_BUDGET, pcm=None):
+        self.pygame = pygame
+        self.directory = directory
+        self.budget = budget
+        self.pcm = pcm
+        self._lock = threading.Lock()
+        # track -> (Sound, bytes), least recently used first
+        self.sounds = collections.OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # bytes a decoded sound takes at the mixer's format
+    def sound_size(self, sound):
+        frequency, size, channels = self.pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+    def _decode(self, track):
+        started = time.monotonic()
+        if self.pcm is not None:
+            sound = self.pcm.load(track)
+        else:
+            sound = self.pygame.mixer.Sound(os.path.join(self.directory, track))
+        log.debug("decoded %s in %.0f ms", track, 1000 * (time.monotonic() - started))
+        return sound
+
+    # add a decoded track, returns False if it was not added because evict is off and it does not fit
+    def _insert(self, track, sound, evict=True):
+        size = self.sound_size(sound)
+        with self._lock:
+            if track in self.sounds:
+                return True
+            if not evict and self.used + size > self.budget:
+                return False
+            self.sounds[track] = (sound, size)
+            self.used += size
+            # never drops the track just added, even if it is over budget on its own
+            while self.used > self.budget and len(self.sounds) > 1:
+                name, (old, old_size) = self.sounds.popitem(last=False)
+                self.used -= old_size
+                self.evictions += 1
+                log.info("dropped %s from the audio cache (%d of %d bytes used)", name, self.used, self.budget)
+        return True
+
+    # the decoded track if it is in memory, without decoding anything
+    def peek(self, track):
+        with self._lock:
+            entry = self.sounds.get(track)
+            if entry is None:
+                return None
+            self.sounds.move_to_end(track)
+            self.hits += 1
+            return entry[0]
+
+    # the decoded track, decoding it now if it is not in memory (blocking)
+    def get(self, track):
+        sound = self.peek(track)
+        if sound is not None:
+            return sound
+        with self._lock:
+            self.misses += 1
+        sound = self._decode(track)
+        self._insert(track, sound)
+        return sound
+
+    # decode tracks in a background thread, in the order given, until the budget is used up
+    # (preloading never drops a track; the ones that do not fit are decoded when first played)
+    def preload(self, tracks, background=True):
+        def load():
+            for track in tracks:
+                with self._lock:
+                    cached = track in self.sounds
+                if not cached and not self._insert(track, self._decode(track), evict=False):
+                    log.info("audio cache full, %s and later tracks load when played", track)
+                    break
+            log.info("audio cache ready: %d tracks, %.1f MB", len(self.sounds), self.used / 1e6)
+            # loudness envelopes for the lights, small enough to keep for every track
+            if self.pcm is not None:
+                try:
+                    for track in tracks:
+                        self.pcm.envelope(track)
+                except ValueError as e:
+                    log.warning("no audio envelopes: %s", e)
+        if not background:
+            load()
+            return None
+        thread = threading.Thread(target=load, name="audio-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        with self._lock:
+            return {"tracks": len(self.sounds), "bytes": self.used, "budget": self.budget,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+# plays decoded tracks on one reserved mixer channel
+class Player:
+    def __init__(self, pygame, channel=0):
+        self.pygame = pygame
+        pygame.mixer.set_reserved(channel + 1)
+        self.channel = pygame.mixer.Channel(channel)
+
+    def play_sound(self, sound):
+        self.channel.play(sound)
+
+    def stop(self):
+        self.channel.stop()
+
+    def get_busy(self):
+        return self.channel.get_busy()
+
+# one Player per kind of audio (see CHANNELS), playing tracks from one cache
+class AudioManager:
+    def __init__(self, pygame, cache, channels=CHANNELS):
+        self.cache = cache
+        # lowest channel first, each Player reserves every channel up to its own
+        self.players = {}
+        for name, channel in sorted(channels.items(), key=lambda item: item[1]):
+            self.players[name] = Player(pygame, channel)
+
+    def __getitem__(self, name):
+        return self.players[name]
+
+    def stop(self):
+        for player in self.players.values():
+            player.stop()
@@ -0,0 +1,106 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# software debounce for the show's buttons, replacing RPi.GPIO's 5 second bouncetime
+# every edge only stores the button's level and the time it changed; a rising edge after the line
+# has been quiet for the settle window becomes a candidate press; the candidate is confirmed if the
+# button is still down after the minimum press duration, and dropped as a glitch if it is up and the
+# line has settled
+# switch chatter therefore costs one timestamp per edge and at most one wakeup of the show per press,
+# however many edges it produces; no timers are started per edge
+# an optional lockout ignores a button for a while after an accepted press, on top of the show only
+# listening to the buttons that make sense in its current state (see showinput.py)
+
+import collections
+import threading
+
+# all in seconds
+Settings = collections.namedtuple("Settings", "settle min_press lockout")
+DEFAULT = Settings(settle=0.02, min_press=0.005, lockout=0.0)
+
+# check() results
+PRESSED = "pressed"
+REJECTED = "rejected"
+
+class Button:
+    __slots__ = ("level", "changed", "pending", "held", "locked_until", "edges", "presses", "rejected")
+
+    def __init__(self):
+        self.level = 0
+        self.changed = float("-inf")
+        # time of the candidate press waiting to be confirmed
+        self.pending = None
+        # level at the end of the minimum press duration, if the line has changed since
+        self.held = None
+        self.locked_until = float("-inf")
+        self.edges = 0
+        self.presses = 0
+        self.rejected = 0
+
+class Debouncer:
+    # settings apply to every button, per_button overrides them by pin
+    def __init__(self, settings=DEFAULT, per_button=None):
+        self.settings = settings
+        self.per_button = dict(per_button or {})
+        self.buttons = collections.defaultdict(Button)
+        self._lock = threading.Lock()
+
+    def settings_for(self, pin):
+        return self.per_button.get(pin, self.settings)
+
+    # record an edge, returns True when it starts a candidate press that check() has to confirm
+    def edge(self, pin, level, now):
+        settings = self.settings_for(pin)
+        with self._lock:
+            button = self.buttons[pin]
+            button.edges += 1
+            quiet = now - button.changed >= settings.settle
+            if button.pending is not None and button.held is None and now >= button.pending + settings.min_press:
+                # the show has not looked at the candidate yet, remember how it stood when it could have
+                button.held = button.level
+            # the level is read when the callback runs, so a low -> high change is what marks a rising edge
+            rising = level and not button.level
+            button.level = level
+            button.changed = now
+            if rising and quiet and button.pending is None and now >= button.locked_until:
+                button.pending = now
+                button.held = None
+                return True
+            return False
+
+    # PRESSED or REJECTED for the pending candidate, or seconds to wait before asking again
+    def check(self, pin, now):
+        settings = self.settings_for(pin)
+        with self._lock:
+            button = self.buttons[pin]
+            if button.pending is None:
+                return REJECTED
+            ready = button.pending + settings.min_press
+            if now < ready:
+                return ready - now
+            held = button.level if button.held is None else button.held
+            if not held:
+                settled = button.changed + settings.settle
+                if now < settled:
+                    # released or bouncing, decide once the line has been quiet for the settle window
+                    return settled - now
+                if not button.level:
+                    button.pending = None
+                    button.rejected += 1
+                    return REJECTED
+            button.pending = None
+            button.presses += 1
+            button.locked_until = now + settings.lockout
+            return PRESSED
+
+    # drop a candidate that is no longer wanted, e.g. when the show stops listening
+    def cancel(self, pin):
+        with self._lock:
+            self.buttons[pin].pending = None
+
+    # edges, presses and rejected candidates per button
+    def stats(self):
+        with self._lock:
+            return {pin: {"edges": b.edges, "presses": b.presses, "rejected": b.rejected}
+                    for pin, b in self.buttons.items()}
@@ -0,0 +1,122 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# hardware backends for strawberrycough.py
+# "real" is the Pi: RPi.GPIO, the NeoPixel strip and pygame's mixer
+# "sim" runs the whole show on a laptop: fakegpio.py for buttons and relays, fakepixels.py for the
+# strip and fakemixer.py for silent audio that still lasts as long as the real tracks
+# nothing from the real backend is imported in sim mode, so the Pi libraries need not be installed
+#
+# $ ./strawberrycough.py --sim                                       # type start / yes / no + Enter
+# $ SHOW_PRESSES="start:2 yes:45 no:10 ..." ./strawberrycough.py --sim --once
+#
+# SHOW_HARDWARE=sim works as well as --sim; SHOW_PRESSES (or --presses) scripts the button presses,
+# each "button:seconds" pressed that many seconds after the previous one; --once exits after one
+# session instead of restarting
+
+import logging
+import os
+import sys
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+BACKENDS = ("real", "sim")
+
+# "real" or "sim", from the command line or the environment
+def selected(argv=None, environ=None):
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    if "--sim" in argv:
+        return "sim"
+    backend = environ.get("SHOW_HARDWARE", "real")
+    if backend not in BACKENDS:
+        raise ValueError("SHOW_HARDWARE must be one of %s, not %r" % (", ".join(BACKENDS), backend))
+    return backend
+
+# value of --name VALUE on the command line, or the environment variable
+def option(name, variable, argv=None):
+    argv = sys.argv if argv is None else argv
+    if name in argv[:-1]:
+        return argv[argv.index(name) + 1]
+    return os.environ.get(variable)
+
+# [(button name, seconds after the previous press)] from "start:2 yes:45 ..."
+def parse_presses(script):
+    presses = []
+    for item in script.replace(",", " ").split():
+        name, _, delay = item.partition(":")
+        presses.append((name, float(delay or 0)))
+    return presses
+
+class Hardware:
+    def __init__(self, backend=None):
+        self.backend = selected() if backend is None else backend
+        self.simulated = self.backend == "sim"
+        self.once = "--once" in sys.argv
+        if self.simulated:
+            import fakegpio
+            import fakemixer
+            import fakepixels
+            self.gpio = fakegpio
+            self.pygame = fakemixer
+            self._strip = fakepixels.FakeNeoPixel
+        else:
+            import RPi.GPIO
+            import pygame
+            self.gpio = RPi.GPIO
+            self.pygame = pygame
+
+    # pin for the strip's data line by its board name, e.g. "D21"
+    def pin(self, name):
+        if self.simulated:
+            return name
+        import board
+        return getattr(board, name)
+
+    # the LED strip, left at full brightness
+    def strip(self, pin, num_pixels, order):
+        if self.simulated:
+            return self._strip(num_pixels, brightness=1.0, auto_write=False, pixel_order=order, wire_time=True)
+        import neopixel
+        return neopixel.NeoPixel(pin, num_pixels, brightness=1.0, auto_write=False, pixel_order=order)
+
+    # sim only: press buttons ({name: pin}) from SHOW_PRESSES/--presses, or from lines typed on stdin
+    def simulate_buttons(self, buttons):
+        if not self.simulated:
+            return
+        script = option("--presses", "SHOW_PRESSES")
+        if script:
+            target = self._scripted
+            args = (buttons, parse_presses(script))
+        else:
+            target = self._typed
+            args = (buttons,)
+        threading.Thread(target=target, args=args, name="presses", daemon=True).start()
+
+    def _press(self, buttons, name):
+        if name not in buttons:
+            log.warning("no button %r, use one of %s", name, ", ".join(buttons))
+            return
+        log.info("pressing %s", name)
+        self.gpio.press(buttons[name])
+
+    def _scripted(self, buttons, presses):
+        for name, delay in presses:
+            time.sleep(delay)
+            self._press(buttons, name)
+
+    def _typed(self, buttons):
+        for line in sys.stdin:
+            name = line.strip()
+            # first letter is enough
+            matches = [b for b in buttons if b.startswith(name)] if name else []
+            self._press(buttons, matches[0] if len(matches) == 1 else name)
+
+    # relay and motor changes so far, as (time.monotonic(), pin, level); sim only
+    def relay_log(self):
+        if not self.simulated:
+            return []
+        return list(self.gpio.output_log)
@@ -0,0 +1,104 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# button input for the show
+# edge callbacks are registered once for every button; each press is pushed with its time onto a
+# queue the show logic blocks on (with a timeout), so a press is handled as soon as it happens
+# instead of whenever the show next gets around to polling GPIO.event_detected
+# only buttons the show is currently listening for are queued, which replaces removing and
+# re-adding edge detection between questions
+# both edges are watched and run through the software debounce in showdebounce.py; the show's
+# wait() confirms a candidate press once it has been held long enough
+
+import collections
+import queue
+import threading
+import time
+
+import showdebounce
+
+# button (pin), edge ("rising"/"falling"), time.monotonic() of the edge
+Event = collections.namedtuple("Event", "button edge time")
+
+class InputQueue:
+    # debounce is a showdebounce.Debouncer, by default with showdebounce.DEFAULT for every button
+    def __init__(self, gpio, pins, debounce=None):
+        self.gpio = gpio
+        self.pins = tuple(pins)
+        self.debounce = showdebounce.Debouncer() if debounce is None else debounce
+        self.events = queue.Queue()
+        self._lock = threading.Lock()
+        self.listening = set()
+        self.received = 0
+        self.ignored = 0
+        # candidate presses handed to the show thread, the only edges that wake it
+        self.candidates = 0
+        for pin in self.pins:
+            gpio.add_event_detect(pin, gpio.BOTH, callback=self._edge)
+
+    # runs on the GPIO event thread
+    def _edge(self, pin):
+        now = time.monotonic()
+        level = self.gpio.input(pin)
+        with self._lock:
+            self.received += 1
+            if not self.debounce.edge(pin, level, now):
+                return
+            if pin not in self.listening:
+                self.debounce.cancel(pin)
+                self.ignored += 1
+                return
+            self.candidates += 1
+        self.events.put(Event(pin, "rising", now))
+
+    # queue events from these buttons only, anything pressed before now is dropped
+    def listen(self, *pins):
+        with self._lock:
+            self.listening = set(pins)
+            for pin in self.pins:
+                self.debounce.cancel(pin)
+            self.clear()
+
+    # stop queueing events from these buttons (all buttons if none are given)
+    def ignore(self, *pins):
+        with self._lock:
+            self.listening.difference_update(pins or self.pins)
+
+    def clear(self):
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    # for events that do not come from a button
+    def put(self, event):
+        self.events.put(event)
+
+    # next event, or None after timeout seconds (None waits forever)
+    # button events are only returned once the debounce has confirmed them as a press
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + max(timeout, 0.0)
+        while True:
+            left = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                event = self.events.get(timeout=left)
+            except queue.Empty:
+                return None
+            if event.button not in self.pins or self._confirm(event.button):
+                return event
+
+    # hold the show thread until a candidate press is confirmed or dropped (a few milliseconds)
+    def _confirm(self, pin):
+        while True:
+            result = self.debounce.check(pin, time.monotonic())
+            if result == showdebounce.PRESSED:
+                return pin in self.listening
+            if result == showdebounce.REJECTED:
+                return False
+            time.sleep(result)
+
+    def close(self):
+        for pin in self.pins:
+            self.gpio.remove_event_detect(pin)
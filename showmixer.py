@@ -0,0 +1,219 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# mixer settings for the show and a calibration that picks the buffer size
+# a smaller mixer buffer starts sounds sooner but gives the audio thread less slack, so when the Pi
+# is busy it can run dry (an underrun, heard as a click or gap); the calibration plays a click at
+# each buffer size through SDL's "disk" audio driver, which writes the mixed output to a file at the
+# pace a sound card would consume it, and measures
+#   start latency: from Channel.play() until the click shows up in the output
+#   shortfall:     ms of audio missing from the output while a tone plays, against the bytes the
+#                  stream wrote per second while nothing played; underruns are the whole buffers
+#                  of it, i.e. buffers the mixer did not deliver in time
+# a loaded machine (or a VM) slows the output now and then whatever the buffer size, so the pair of
+# windows is measured REPEATS times and only the shortfall every repeat had counts: a starving mixer
+# falls behind each time, a one-off stall does not reject a buffer size
+# the output's own pace is the reference, not frequency x frame size, because the disk driver sleeps
+# whole milliseconds between buffers and so runs a few percent fast or slow of the sample rate
+# both paces are timed between two writes of the output file, so how quickly this program polls
+# the file only affects their endpoints, not the count
+# the quickest buffer size without underruns is written to mixer.json, which strawberrycough.py reads
+# at startup; its latency also shifts the audio-reactive lights (see ledeffects.reactive_rainbow)
+# the disk driver covers pygame and SDL, not the ALSA buffer behind the 3.5 mm jack
+#
+# $ python3 showmixer.py            # benchmark every buffer size and save the best one
+# $ python3 showmixer.py --dry-run  # benchmark only
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import ledpacing
+
+log = logging.getLogger(__name__)
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mixer.json")
+
+# pygame's own defaults, used until a calibration has been saved
+DEFAULTS = {"frequency": 44100, "size": -16, "channels": 2, "buffer": 512, "latency": 0.0}
+
+# buffer sizes (sample frames) the calibration tries
+BUFFER_SIZES = (256, 512, 1024, 2048, 4096)
+# clicks played per buffer size
+TRIALS = 20
+# seconds the output's pace is measured for, with nothing playing and then with a tone
+TONE_SECONDS = 3.0
+# times the idle and tone windows are measured, a shortfall has to show up in all of them
+REPEATS = 3
+# seconds between checks of the output file
+POLL = 0.0005
+
+# saved settings, DEFAULTS for anything missing
+def load(path=CONFIG_FILE):
+    settings = dict(DEFAULTS)
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return settings
+    settings.update((k, saved[k]) for k in DEFAULTS if k in saved)
+    return settings
+
+def save(settings, results=None, path=CONFIG_FILE):
+    data = {k: settings[k] for k in DEFAULTS}
+    if results is not None:
+        data["benchmark"] = results
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+# start pygame's mixer with the settings
+def init(pygame, settings):
+    pygame.mixer.init(frequency=settings["frequency"], size=settings["size"], channels=settings["channels"],
+                      buffer=settings["buffer"])
+
+# raw signed 16 bit samples of a full-scale 1 kHz square wave
+def square_wave(frequency, channels, seconds):
+    half = max(frequency // 2000, 1)
+    high = (32767).to_bytes(2, "little", signed=True) * channels
+    low = (-32767).to_bytes(2, "little", signed=True) * channels
+    count = int(frequency * seconds)
+    cycle = high * half + low * half
+    return (cycle * (count // (2 * half) + 1))[:count * 2 * channels]
+
+class DiskOutput:
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    # skip everything written so far
+    def mark(self):
+        self.offset = self.size()
+
+    # seconds until a non-silent byte is written after the mark, None after timeout
+    def wait_for_sound(self, timeout=2.0):
+        started = time.monotonic()
+        with open(self.path, "rb") as f:
+            while time.monotonic() - started < timeout:
+                f.seek(self.offset)
+                data = f.read()
+                self.offset += len(data)
+                if data.strip(b"\x00"):
+                    return time.monotonic() - started
+                time.sleep(POLL)
+        return None
+
+    # time and size of the output file when it next grows
+    def next_write(self, timeout=2.0):
+        size = self.size()
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            grown = self.size()
+            if grown != size:
+                return time.monotonic(), grown
+            time.sleep(POLL)
+        raise RuntimeError("no audio written to %s for %.1f s" % (self.path, timeout))
+
+    # bytes per second written over about seconds, from one write of the output to another
+    def pace(self, seconds):
+        started, first = self.next_write()
+        time.sleep(seconds)
+        ended, last = self.next_write()
+        return (last - first) / (ended - started)
+
+# start latency and shortfall for one buffer size, pygame's mixer must not be running
+def benchmark(pygame, buffer, settings=DEFAULTS, trials=TRIALS, tone_seconds=TONE_SECONDS, repeats=REPEATS):
+    settings = dict(settings, buffer=buffer)
+    fd, path = tempfile.mkstemp(prefix="showmixer-", suffix=".raw")
+    os.close(fd)
+    os.environ["SDL_AUDIODRIVER"] = "disk"
+    os.environ["SDL_DISKAUDIOFILE"] = path
+    init(pygame, settings)
+    try:
+        frequency, size, channels = pygame.mixer.get_init()
+        if size != -16:
+            raise ValueError("calibration needs signed 16 bit samples, the mixer opened with %d" % size)
+        settings.update(frequency=frequency, channels=channels)
+        click = pygame.mixer.Sound(buffer=square_wave(frequency, channels, 0.02))
+        tone = pygame.mixer.Sound(buffer=square_wave(frequency, channels, tone_seconds + 1.0))
+        channel = pygame.mixer.Channel(0)
+        output = DiskOutput(path)
+        # let the output stream get going
+        time.sleep(0.5)
+        latencies = []
+        for _ in range(trials):
+            output.mark()
+            channel.play(click)
+            latency = output.wait_for_sound()
+            if latency is not None:
+                latencies.append(latency)
+            channel.stop()
+            time.sleep(0.1)
+        rate = settings["frequency"] * settings["channels"] * 2
+        paces = []
+        shortfalls = []
+        for _ in range(repeats):
+            idle = output.pace(tone_seconds)
+            channel.play(tone)
+            playing = output.pace(tone_seconds)
+            channel.stop()
+            paces.append(idle / rate)
+            # seconds of audio the stream fell behind its idle pace while the tone played
+            shortfalls.append(max(idle - playing, 0.0) * tone_seconds / rate)
+    finally:
+        pygame.mixer.quit()
+        os.remove(path)
+    period = buffer / float(settings["frequency"])
+    shortfall = min(shortfalls)
+    latencies.sort()
+    return {"buffer": buffer, "period_ms": 1000 * period, "clicks": len(latencies), "trials": trials,
+            "p50_ms": 1000 * ledpacing.percentile(latencies, 0.5),
+            "p95_ms": 1000 * ledpacing.percentile(latencies, 0.95),
+            "pace": min(paces), "shortfalls_ms": [round(1000 * s, 1) for s in shortfalls],
+            "shortfall_ms": 1000 * shortfall, "underruns": int(shortfall / period)}
+
+# the result to use: the lowest latency among the buffer sizes without underruns (and with every
+# click heard), or the largest buffer tried if every size had trouble
+def choose(results):
+    clean = [r for r in results if r["underruns"] == 0 and r["clicks"] == r["trials"]]
+    if not clean:
+        return max(results, key=lambda r: r["buffer"])
+    return min(clean, key=lambda r: (r["p50_ms"], r["buffer"]))
+
+def calibrate(pygame, buffers=BUFFER_SIZES, settings=None):
+    settings = load() if settings is None else dict(settings)
+    results = []
+    for buffer in buffers:
+        result = benchmark(pygame, buffer, settings)
+        log.info("buffer %5d: latency p50 %.1f ms p95 %.1f ms, %s ms short (%d underruns)", buffer,
+                 result["p50_ms"], result["p95_ms"], " / ".join("%.1f" % ms for ms in result["shortfalls_ms"]),
+                 result["underruns"])
+        results.append(result)
+    best = choose(results)
+    settings.update(buffer=best["buffer"], latency=round(best["p50_ms"] / 1000.0, 4))
+    return settings, results
+
+if __name__ == "__main__":
+    import pygame
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    settings, results = calibrate(pygame)
+    print("%7s %9s %9s %9s %9s %9s" % ("buffer", "period", "p50", "p95", "short", "underruns"))
+    for r in results:
+        print("%7d %7.1f ms %6.1f ms %6.1f ms %6.1f ms %9d" % (r["buffer"], r["period_ms"], r["p50_ms"], r["p95_ms"],
+                                                             r["shortfall_ms"], r["underruns"]))
+    print("best: buffer %d, %.1f ms to start a sound" % (settings["buffer"], 1000 * settings["latency"]))
+    if "--dry-run" not in sys.argv:
+        save(settings, results)
+        print("saved to %s" % CONFIG_FILE)
@@ -0,0 +1,221 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# on-disk PCM cache for the show's audio
+# each mp3 is decoded once to raw samples in the mixer's format and written to .audiocache/; after
+# that a track is loaded by mapping its file and handing the mapped bytes to pygame.mixer.Sound, so
+# no mp3 is decoded again after a restart
+# files are keyed by the mp3's content hash and the mixer settings, a replaced mp3 or a different
+# mixer setup gets a new file and the stale ones are deleted
+# next to each track's samples the cache keeps its loudness envelope, one byte per ENVELOPE_STEP
+# seconds, for lights that follow the audio (see ledeffects.reactive_rainbow)
+#
+# $ python3 showpcm.py            # warm the cache for every mp3 in this directory
+
+import array
+import glob
+import hashlib
+import logging
+import mmap
+import os
+import sys
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+log = logging.getLogger(__name__)
+
+# cache files live next to the show script
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".audiocache")
+
+# bump when the file layout changes so old files are never played
+CACHE_VERSION = 1
+
+# seconds of audio per envelope byte
+ENVELOPE_STEP = 0.01
+
+# numpy sample type for each pygame.mixer.get_init() sample size (32 is float)
+SAMPLE_TYPES = {8: "u1", -8: "i1", 16: "<u2", -16: "<i2", 32: "<f4"}
+
+# first 16 hex digits of the sha256 of a file
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+# "s16"/"u8"/... for a pygame.mixer.get_init() sample size
+def sample_format(size):
+    return "%s%d" % ("s" if size < 0 else "u", abs(size))
+
+# name of the cache file for one track, mp3 contents and mixer setup
+def cache_key(track, digest, frequency, size, channels):
+    stem = os.path.splitext(os.path.basename(track))[0]
+    return "v%d-%s-%s-%d-%s-%d" % (CACHE_VERSION, stem, digest, frequency, sample_format(size), channels)
+
+# loudness of raw samples in the mixer's format, one byte per step seconds
+# each byte is the RMS of that step scaled so the loudest step of the track is 255, quiet tracks
+# move the lights as much as loud ones
+def envelope(data, frequency, size, channels, step=ENVELOPE_STEP):
+    window = max(int(frequency * step), 1) * channels
+    if numpy is not None:
+        samples = numpy.frombuffer(data, dtype=SAMPLE_TYPES[size])
+        count = len(samples) // window
+        x = samples[:count * window].astype(numpy.float32).reshape(count, window)
+        if size > 0 and size != 32:
+            # unsigned samples are centred on half scale
+            x -= 2 ** (size - 1)
+        rms = numpy.sqrt(numpy.mean(x * x, axis=1))
+        peak = rms.max() if count else 0.0
+        if peak > 0:
+            rms *= 255.0 / peak
+        return rms.astype(numpy.uint8).tobytes()
+    if size != -16:
+        raise ValueError("envelopes of %s samples need numpy" % sample_format(size))
+    samples = array.array("h")
+    samples.frombytes(bytes(data[:len(data) // 2 * 2]))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    sums = [sum(v * v for v in samples[i:i + window]) for i in range(0, len(samples) - window + 1, window)]
+    peak = max(sums, default=0)
+    if peak == 0:
+        return bytes(len(sums))
+    return bytes(int(255 * (v / peak) ** 0.5) for v in sums)
+
+class PcmCache:
+    def __init__(self, pygame, source_dir=".", directory=CACHE_DIR):
+        self.pygame = pygame
+        self.source_dir = source_dir
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        # track -> envelope bytes, see envelope()
+        self.envelopes = {}
+        # source path -> (mtime, size, content hash), so an unchanged mp3 is hashed once per run
+        self._digests = {}
+        # the preload thread and the show's executor may load the same track at once
+        self._lock = threading.RLock()
+
+    def _digest(self, source):
+        st = os.stat(source)
+        known = self._digests.get(source)
+        if known is None or known[:2] != (st.st_mtime_ns, st.st_size):
+            known = (st.st_mtime_ns, st.st_size, content_hash(source))
+            self._digests[source] = known
+        return known[2]
+
+    def _path(self, track):
+        source = os.path.join(self.source_dir, track)
+        frequency, size, channels = self.pygame.mixer.get_init()
+        key = cache_key(track, self._digest(source), frequency, size, channels)
+        return source, os.path.join(self.directory, key + ".pcm")
+
+    def _write(self, path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # decode the mp3 and write its samples, returns the decoded sound
+    def _build(self, track, source, path):
+        sound = self.pygame.mixer.Sound(source)
+        self._write(path, sound.get_raw())
+        self.prune(track, path)
+        return sound
+
+    # the track as a pygame.mixer.Sound, decoded and cached if it has not been before
+    def load(self, track):
+        with self._lock:
+            return self._load(track)
+
+    def _load(self, track):
+        source, path = self._path(track)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            log.info("transcoding %s into the pcm cache", track)
+            return self._build(track, source, path)
+        self.hits += 1
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.pygame.mixer.Sound(buffer=b"")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # pygame copies the samples straight out of the mapping
+                return self.pygame.mixer.Sound(buffer=data)
+
+    # loudness envelope of the track (see envelope() above), read from the cache or computed from the
+    # cached samples; kept in self.envelopes so the show can look it up without touching the disk
+    def envelope(self, track):
+        with self._lock:
+            if track in self.envelopes:
+                return self.envelopes[track]
+            source, path = self._path(track)
+            env_path = path[:-len(".pcm")] + ".env"
+            try:
+                with open(env_path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                if not os.path.exists(path):
+                    self._build(track, source, path)
+                with open(path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        data = b""
+                    else:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as samples:
+                            data = envelope(samples, *self.pygame.mixer.get_init())
+                self._write(env_path, data)
+            self.envelopes[track] = data
+            return data
+
+    # make sure every track has current cache files, returns how many had to be transcoded
+    def build(self, tracks):
+        built = 0
+        with self._lock:
+            for track in tracks:
+                source, path = self._path(track)
+                if not os.path.exists(path):
+                    self._build(track, source, path)
+                    built += 1
+                self.envelope(track)
+        return built
+
+    # delete files for track other than current's (an older mp3, mixer setup or cache version)
+    def prune(self, track, current):
+        stem = os.path.splitext(os.path.basename(track))[0]
+        key = os.path.basename(current).partition(".")[0]
+        for f in glob.glob(os.path.join(glob.escape(self.directory), "v*-%s-*" % glob.escape(stem))):
+            name = os.path.basename(f).partition(".")[0]
+            parts = name.split("-")
+            if name != key and len(parts) == 6 and parts[1] == stem:
+                os.remove(f)
+
+    # total bytes of cache files on disk
+    def disk_size(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        paths = (os.path.join(self.directory, f) for f in os.listdir(self.directory))
+        return sum(os.path.getsize(f) for f in paths if os.path.isfile(f))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "disk_bytes": self.disk_size()}
+
+if __name__ == "__main__":
+    import pygame
+
+    import showmixer
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    # same mixer setup as strawberrycough.py, so the cached samples match what it plays
+    showmixer.init(pygame, showmixer.load())
+    here = os.path.dirname(os.path.abspath(__file__))
+    tracks = sys.argv[1:] or sorted(os.path.basename(f) for f in glob.glob(os.path.join(here, "*.mp3")))
+    cache = PcmCache(pygame, here)
+    built = cache.build(tracks)
+    print("%d of %d tracks transcoded, %.1f MB in %s" % (built, len(tracks), cache.disk_size() / 1e6, cache.directory))
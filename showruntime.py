@@ -0,0 +1,213 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# asyncio runtime for the show
+# the show logic is a coroutine; waiting for a button, for a track to finish, for the motors and for
+# the question timers are all awaitables on one event loop, so they run side by side and a press
+# can cancel pending timers the moment it arrives
+# button events are pumped from the input queue (see showinput.py) by one thread that sleeps until
+# a press is confirmed; tracks come decoded from the audio cache (see showaudio.py), and one that is
+# not decoded yet is decoded in the default executor so it never stalls the loop; voice, effects and
+# ambience play on their own mixer channels, and the next track can be cued while something else
+# happens so it starts the moment it is needed
+# every timer (the question warning and timeout, the motors, the end of a track) is a deadline on
+# the event loop's own heap of timers, on the monotonic clock: the loop sleeps in select() until the
+# earliest one is due, a press cancels them without anything polling, and how late each kind fired
+# (its overshoot) is kept in a histogram per name, see overshoot_report()
+# the end of a track is a timer set from its decoded length (pygame's end events need pygame.display,
+# which the show does not initialise), and arrives as an Event(channel, ENDED, time) on the same
+# queue as the button presses, so nothing polls the mixer
+# the lights keep their own fixed-rate render thread (see ledrender.py), driven with commands that
+# return immediately
+
+import asyncio
+import functools
+import threading
+import time
+
+import showinput
+import showtrace
+
+# edge of the event queued when a track ends, its button is the channel name
+ENDED = "ended"
+
+class Runtime:
+    # audio is a showaudio.AudioManager
+    def __init__(self, buttons, gpio, audio):
+        self.buttons = buttons
+        self.gpio = gpio
+        self.audio = audio
+        # track -> task decoding it, see cue()
+        self.cued = {}
+        # channel -> timer for the end of the track playing on it
+        self.playing = {}
+        # timer name -> showtrace.Histogram of how many ms after its deadline it fired
+        self.overshoot = {}
+        self.loop = None
+        self.events = None
+        self.listened_at = 0.0
+
+    # call from inside the running loop before anything else
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.events = asyncio.Queue()
+        threading.Thread(target=self._pump, name="input", daemon=True).start()
+
+    def _pump(self):
+        while True:
+            event = self.buttons.wait()
+            self.loop.call_soon_threadsafe(self.events.put_nowait, event)
+
+    # back to how a session starts: every channel stopped, nothing cued, no button listened for and
+    # nothing queued
+    def reset(self):
+        for timer in self.playing.values():
+            timer.cancel()
+        self.playing.clear()
+        for task in self.cued.values():
+            task.cancel()
+        self.cued.clear()
+        self.audio.stop()
+        self.listen()
+        self._drain(lambda event: True)
+
+    # run a blocking call in the executor
+    async def call(self, func, *args, **kwargs):
+        return await self.loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    # listen for these buttons only, presses from before now are dropped
+    def listen(self, *pins):
+        self.listened_at = time.monotonic()
+        self.buttons.listen(*pins)
+        self._requeue(self._drain(lambda event: event.button in self.buttons.pins))
+
+    # take every queued event out of the queue, returns the ones dropped(event) is False for
+    def _drain(self, dropped):
+        kept = []
+        while not self.events.empty():
+            event = self.events.get_nowait()
+            if not dropped(event):
+                kept.append(event)
+        return kept
+
+    def _requeue(self, events):
+        for event in events:
+            self.events.put_nowait(event)
+
+    def ignore(self, *pins):
+        self.buttons.ignore(*pins)
+
+    # record that the timer name fired seconds late
+    def late(self, name, seconds):
+        if name not in self.overshoot:
+            self.overshoot[name] = showtrace.Histogram()
+        self.overshoot[name].add(1000 * max(seconds, 0.0))
+
+    # how late each kind of timer fired, one line per name
+    def overshoot_report(self):
+        lines = ["%-12s %6s %9s %9s %9s" % ("timer", "count", "mean", "p99", "max")]
+        for name, h in sorted(self.overshoot.items()):
+            lines.append("%-12s %6d %9.2f %9.2f %9.2f" % (name, h.count, h.total / h.count, h.percentile(0.99), h.largest))
+        return "\n".join(lines)
+
+    # sleep until loop time due (the loop's clock is time.monotonic()), the overshoot goes under name
+    async def sleep_until(self, due, name):
+        await asyncio.sleep(max(due - self.loop.time(), 0.0))
+        self.late(name, self.loop.time() - due)
+
+    # next press of a button being listened for (or any other event put on the input queue, but not
+    # a track ending), None after timeout seconds; a timeout counts as a timer called name
+    async def press(self, timeout=None, name="timeout"):
+        due = None if timeout is None else self.loop.time() + timeout
+        try:
+            return await asyncio.wait_for(self._next(), timeout)
+        except asyncio.TimeoutError:
+            self.late(name, self.loop.time() - due)
+            return None
+
+    async def _next(self):
+        while True:
+            event = await self.events.get()
+            if event.edge == ENDED:
+                continue
+            if event.button not in self.buttons.pins:
+                return event
+            # the pump thread may have been holding a press from before the last listen()
+            if event.button in self.buttons.listening and event.time >= self.listened_at:
+                return event
+
+    # the decoded track from the audio cache
+    async def sound(self, track):
+        sound = self.audio.cache.peek(track)
+        if sound is None:
+            # not decoded yet (or dropped from the cache), decode it in the executor
+            sound = await self.call(self.audio.cache.get, track)
+        return sound
+
+    # get a track ready now so a later play() of it starts without waiting on the cache
+    def cue(self, track):
+        if track not in self.cued:
+            self.cued[track] = asyncio.ensure_future(self.sound(track))
+
+    # start a track on a channel ("voice", "sfx" or "ambience"), replacing what that channel plays
+    # returns the loop time the track will end at
+    async def play(self, track, channel="voice"):
+        cued = self.cued.pop(track, None)
+        sound = await cued if cued is not None else await self.sound(track)
+        self.audio[channel].play_sound(sound)
+        previous = self.playing.pop(channel, None)
+        if previous is not None:
+            previous.cancel()
+        due = self.loop.time() + sound.get_length()
+        self.playing[channel] = self.loop.call_at(due, self._ended, channel, due)
+        return due
+
+    def _ended(self, channel, due):
+        self.late(ENDED, self.loop.time() - due)
+        del self.playing[channel]
+        self.events.put_nowait(showinput.Event(channel, ENDED, time.monotonic()))
+
+    # stop the track on a channel, returns False if nothing was playing on it
+    # its end is queued right away, so a finished() waiting on the channel returns
+    def stop(self, channel="voice"):
+        timer = self.playing.pop(channel, None)
+        if timer is None:
+            return False
+        timer.cancel()
+        self.audio[channel].stop()
+        self.events.put_nowait(showinput.Event(channel, ENDED, time.monotonic()))
+        return True
+
+    # wait for the track on a channel to end (or be stopped), other events stay queued
+    # an end left over from an earlier track is skipped, the channel is still playing after it
+    async def finished(self, channel="voice"):
+        others = []
+        try:
+            while channel in self.playing:
+                event = await self.events.get()
+                if event.button != channel or event.edge != ENDED:
+                    others.append(event)
+        finally:
+            self._requeue(others)
+
+    # switch outputs (e.g. motor relays) on now, returns the task that switches them off after seconds
+    def pulse(self, pins, seconds, name="pulse"):
+        for pin in pins:
+            self.gpio.output(pin, self.gpio.HIGH)
+        due = self.loop.time() + seconds
+        async def off():
+            try:
+                await self.sleep_until(due, name)
+            finally:
+                for pin in pins:
+                    self.gpio.output(pin, self.gpio.LOW)
+        return asyncio.ensure_future(off())
+
+    # task that awaits action() after seconds, cancel it to call it off
+    def after(self, seconds, action, name="after"):
+        due = self.loop.time() + seconds
+        async def delayed():
+            await self.sleep_until(due, name)
+            await action()
+        return asyncio.ensure_future(delayed())
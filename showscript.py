@@ -0,0 +1,139 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# the show as data: show.json lists its phases in order (start button, intro, questions, finale)
+# with their audio, timeouts, indicator LEDs and motors, and is compiled into a table of states
+# each phase has a kind; strawberrycough.py supplies one async action per kind, which runs a phase
+# and returns the event it ended with, and run() follows the table from state to state
+# by default every event leads to the next phase, except a question's "timeout", which ends the
+# session; a phase's "on" overrides this, e.g. "on": {"timeout": "q1"} or {"answered": "end"}
+# "defaults" holds settings shared by every phase, a phase's own settings win
+#
+# $ python3 showscript.py [show.json]      # check a show file and print its state table
+
+import collections
+import json
+import os
+import sys
+
+SHOW_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "show.json")
+
+# events each kind of phase can end with, the first is the one that normally moves the show on
+KINDS = {
+    "start": ("pressed",),
+    "play": ("ended",),
+    "question": ("answered", "timeout"),
+}
+
+# settings each kind of phase must have, after defaults are applied
+REQUIRED = {
+    "start": ("button",),
+    "play": ("audio",),
+    "question": ("audio", "indicator", "answers", "motors", "motor_seconds", "warning", "warning_timeout",
+                 "timeout"),
+}
+
+# events that end the session unless a phase says otherwise
+ENDING = ("timeout",)
+
+# target of a transition that ends the session
+END = "end"
+
+# one compiled phase: its settings, where each event leads (a state index, None to end) and the
+# audio of the state its normal event leads to, so it can be cued ahead of time
+State = collections.namedtuple("State", "index name kind args on next_audio")
+
+# states from a parsed show file, raises ValueError for anything wrong with it
+def compile_script(script):
+    defaults = script.get("defaults", {})
+    phases = script.get("phases")
+    if not phases:
+        raise ValueError("show has no phases")
+    names = {}
+    for i, phase in enumerate(phases):
+        name = phase.get("name")
+        if not name or name == END:
+            raise ValueError("phase %d needs a name other than %r" % (i, END))
+        if name in names:
+            raise ValueError("two phases are called %r" % name)
+        if phase.get("kind") not in KINDS:
+            raise ValueError("phase %r: kind must be one of %s" % (name, ", ".join(KINDS)))
+        names[name] = i
+
+    states = []
+    for i, phase in enumerate(phases):
+        name, kind = phase["name"], phase["kind"]
+        args = dict(defaults)
+        args.update((k, v) for k, v in phase.items() if k not in ("name", "kind", "on"))
+        missing = [k for k in REQUIRED[kind] if k not in args]
+        if missing:
+            raise ValueError("phase %r is missing %s" % (name, ", ".join(missing)))
+        following = i + 1 if i + 1 < len(phases) else None
+        on = {event: None if event in ENDING else following for event in KINDS[kind]}
+        for event, target in phase.get("on", {}).items():
+            if event not in on:
+                raise ValueError("phase %r (%s) has no event %r" % (name, kind, event))
+            if target != END and target not in names:
+                raise ValueError("phase %r: %s leads to unknown phase %r" % (name, event, target))
+            on[event] = None if target == END else names[target]
+        states.append(State(i, name, kind, args, on, None))
+
+    for i, state in enumerate(states):
+        target = state.on[KINDS[state.kind][0]]
+        if target is not None:
+            states[i] = state._replace(next_audio=states[target].args.get("audio"))
+    return states
+
+# make sure the states only use buttons, motors (outputs) and indicator LEDs the booth has
+def check(states, buttons, outputs, indicators):
+    for state in states:
+        name, args = state.name, state.args
+        if state.kind == "start" and args["button"] not in buttons:
+            raise ValueError("phase %r: no button %r" % (name, args["button"]))
+        if state.kind != "question":
+            continue
+        if not 0 <= args["indicator"] < indicators:
+            raise ValueError("phase %r: indicator must be 0 ... %d" % (name, indicators - 1))
+        for answer in args["answers"]:
+            if answer not in buttons:
+                raise ValueError("phase %r: no button %r" % (name, answer))
+            for motor in args["motors"].get(answer, ()):
+                if motor not in outputs:
+                    raise ValueError("phase %r: no motor %r" % (name, motor))
+
+# compiled states from a show file
+def load(path=SHOW_FILE):
+    with open(path) as f:
+        try:
+            script = json.load(f)
+        except ValueError as e:
+            raise ValueError("%s: %s" % (path, e))
+    return compile_script(script)
+
+# every track the show plays, in the order it first needs them
+def tracks(states):
+    found = []
+    for state in states:
+        keys = ("sfx", "audio", "warning") if state.kind == "question" else ("sfx", "audio")
+        for key in keys:
+            track = state.args.get(key)
+            if track and track not in found:
+                found.append(track)
+    return found
+
+# run the states from first; actions maps each kind to an async function that runs a state and
+# returns the event it ended with; returns the last state and event once the session ends
+async def run(states, actions, first=0):
+    state = states[first]
+    while True:
+        event = await actions[state.kind](state)
+        target = state.on[event]
+        if target is None:
+            return state, event
+        state = states[target]
+
+if __name__ == "__main__":
+    for state in load(sys.argv[1] if len(sys.argv) > 1 else SHOW_FILE):
+        on = ", ".join("%s -> %s" % (e, END if t is None else t) for e, t in state.on.items())
+        print("%2d %-8s %-9s %-22s %s" % (state.index, state.name, state.kind, state.args.get("audio", ""), on))
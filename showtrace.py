@@ -0,0 +1,156 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# button-to-action latency tracing
+# every START/YES/NO press is timestamped at the GPIO edge (see showinput.py) and each thing the
+# guest notices afterwards (audio stopping or starting, the first frame of the chase, the motor
+# relays) is marked against it; the latencies go into fixed-bucket histograms per question and stage
+# totals are printed with dump(), kept across restarts in a json file by save(), and can be read
+# back with
+# $ python3 showtrace.py latency.json
+
+import json
+import os
+import sys
+import threading
+import time
+
+# upper bucket bounds in milliseconds, anything slower goes into a last overflow bucket
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+class Histogram:
+    def __init__(self, counts=None, total=0.0, largest=0.0):
+        self.counts = list(counts) if counts else [0] * (len(BUCKETS_MS) + 1)
+        self.total = total
+        self.largest = largest
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def add(self, ms):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                break
+        else:
+            i = len(BUCKETS_MS)
+        self.counts[i] += 1
+        self.total += ms
+        self.largest = max(self.largest, ms)
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.largest = max(self.largest, other.largest)
+
+    # upper bound of the bucket holding fraction p of the samples (never above the slowest one)
+    def percentile(self, p):
+        seen = 0
+        target = p * self.count
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(BUCKETS_MS[i], self.largest) if i < len(BUCKETS_MS) else self.largest
+        return 0.0
+
+    def to_dict(self):
+        return {"counts": self.counts, "total_ms": self.total, "max_ms": self.largest}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["counts"], data["total_ms"], data["max_ms"])
+
+class LatencyTracer:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        # (question, stage) -> Histogram
+        self.histograms = {}
+        self._press = None
+
+    # a press was accepted for question, event is the showinput.Event with the edge time
+    def press(self, question, event):
+        with self._lock:
+            self._press = (question, event.time, set())
+        self._record(self._press, "handled", time.monotonic())
+
+    def _record(self, press, stage, now):
+        question, edge, marked = press
+        with self._lock:
+            # only the first time a stage happens after a press counts
+            if stage in marked:
+                return
+            marked.add(stage)
+            key = (question, stage)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].add(1000.0 * (now - edge))
+
+    # stage happened now (or at now), for the latest press
+    def mark(self, stage, now=None):
+        if self._press is not None:
+            self._record(self._press, stage, time.monotonic() if now is None else now)
+
+    # the show waited on purpose until now (e.g. for the motors), stages marked from here on are timed
+    # from now instead of from the press; markers already handed out keep the press
+    def resume(self, now=None):
+        with self._lock:
+            if self._press is not None:
+                question, edge, marked = self._press
+                self._press = (question, time.monotonic() if now is None else now, marked)
+
+    # callback for another thread (e.g. the render thread) that marks stage for the current press
+    def marker(self, stage):
+        press = self._press
+        def mark(now=None):
+            if press is not None:
+                self._record(press, stage, time.monotonic() if now is None else now)
+        return mark
+
+    # totals as a table, one line per question and stage
+    def dump(self):
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+            lines = ["%-10s %-12s %6s %9s %9s %9s %9s" % ("question", "stage", "count", "mean", "p50", "p95", "max")]
+            for (question, stage), h in items:
+                lines.append("%-10s %-12s %6d %9.1f %9.1f %9.1f %9.1f" % (
+                    question, stage, h.count, h.total / h.count, h.percentile(0.5), h.percentile(0.95), h.largest))
+        return "\n".join(lines)
+
+    # add this session's histograms to the ones already in the file and start over
+    def save(self, path=None):
+        path = path or self.path
+        if path is None:
+            return
+        saved = load(path)
+        with self._lock:
+            for key, h in self.histograms.items():
+                if key in saved:
+                    saved[key].merge(h)
+                else:
+                    saved[key] = h
+            self.histograms = {}
+        data = {"buckets_ms": list(BUCKETS_MS),
+                "histograms": [{"question": q, "stage": s, **h.to_dict()} for (q, s), h in saved.items()]}
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+# histograms saved in a file, or none if it does not exist or has different buckets
+def load(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("buckets_ms") != list(BUCKETS_MS):
+        return {}
+    return {(h["question"], h["stage"]): Histogram.from_dict(h) for h in data["histograms"]}
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: showtrace.py FILE")
+    tracer = LatencyTracer()
+    tracer.histograms = load(sys.argv[1])
+    print(tracer.dump())
@@ -6,27 +6,65 @@
 
 import sys
 import os
-import subprocess
-import psutil
 import time
 import signal
-import RPi.GPIO as GPIO
-import serial
-import neopixel
-import board
-import pygame
-from multiprocessing import Process
-from pygame import mixer
-
-# constant global value used for sleep(value) when motors are turned on after each question
-# increase/decrease as needed with testing for appropriate marble conveyance
-MOTOR_DELAY = 5
+import asyncio
+import logging
+import leddaemon
+import ledcache
+import ledeffects
+import ledlayers
+import ledrecord
+import ledrender
+import ledtransform
+import showaudio
+import showdebounce
+import showhardware
+import showinput
+import showmixer
+import showpcm
+import showscript
+import showruntime
+import showtrace
+
+# timing reports from the LED render thread and others go to the console
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+
+# the phases of the show (start button, intro, questions, finale) with their audio, timeouts,
+# indicator LEDs and motors are read from show.json (see showscript.py); "motor_seconds" there is
+# how long the motors run after each question, increase/decrease as needed with testing for
+# appropriate marble conveyance
+SHOW_FILE = os.environ.get("SHOW_FILE", showscript.SHOW_FILE)
+SHOW = showscript.load(SHOW_FILE)
+
+# RPi.GPIO, the NeoPixel strip and pygame on the Pi, or simulated ones with --sim / SHOW_HARDWARE=sim
+# so the show can run on a laptop (see showhardware.py)
+hardware = showhardware.Hardware()
+GPIO = hardware.gpio
+pygame = hardware.pygame
 
 # do not need to initialize pygame, doing so will cause loss of video feed to terminal
-pygame.mixer.init()
+# the mixer's buffer size comes from mixer.json, written by $ python3 showmixer.py (see showmixer.py)
+MIXER = showmixer.load()
+showmixer.init(pygame, MIXER)
+
+# every track is decoded into memory by a background thread at startup, in the order the show needs
+# them, so playing one reads and decodes nothing (see showaudio.py); decoded samples are kept on disk
+# too, so only the first start after an mp3 changes decodes it (see showpcm.py)
+AUDIO_TRACKS = showscript.tracks(SHOW)
+# bytes of decoded audio kept in memory (~18 MB for all tracks at 44.1 kHz stereo)
+AUDIO_MEMORY = 32 * 1024 * 1024
+AUDIO_DIR = os.path.dirname(os.path.abspath(__file__))
+# the simulated mixer's samples are silence, keep them away from the real ones
+PCM_DIR = os.environ.get("SHOW_PCM_DIR",
+                         os.path.join(showpcm.CACHE_DIR, "sim") if hardware.simulated else showpcm.CACHE_DIR)
+audio_cache = showaudio.SoundCache(pygame, AUDIO_DIR, AUDIO_MEMORY, showpcm.PcmCache(pygame, AUDIO_DIR, PCM_DIR))
+audio_cache.preload(AUDIO_TRACKS)
+# narration plays on the "voice" channel and the button sound on "sfx", so neither cuts off the other
+audio = showaudio.AudioManager(pygame, audio_cache)
 
 # WS2811s must be connected to D10, D12, D18 or D21 to work.
-pixel_pin = board.D21
+pixel_pin = hardware.pin("D21")
 
 # number of lights/chips
 # ~100 for the strand + 10 for the LED question indicators (includes spare)
@@ -34,12 +72,25 @@ num_pixels = 110
 
 # order of the pixel colors - RGB or GRB
 # for RGBW NeoPixels, simply change the ORDER to RGBW or GRBW
-ORDER = neopixel.GRB
+ORDER = "GRB"
+
+# overall LED brightness (0.0 - 1.0) and a dimmer setting for the evening
+# GAMMA of 1.0 keeps the colors as they have always looked, ~2.2 makes dimming look even
+BRIGHTNESS = 0.5
+NIGHT_BRIGHTNESS = 0.2
+GAMMA = 1.0
+# hours (24h clock) between which NIGHT_BRIGHTNESS is used
+NIGHT_START = 19
+NIGHT_END = 7
 
 # setup strand of WS2811s using Neopixel library
-pixels = neopixel.NeoPixel(
-    pixel_pin, num_pixels, brightness=0.5, auto_write=False, pixel_order=ORDER
-)
+# the library is left at full brightness, dimming happens in the compositor's output table (see ledtransform.py)
+# with LED_DAEMON=1 the strip is owned by leddaemon.py (started as root) and frames are handed to it
+# through shared memory, so this program does not need root for the lights
+if os.environ.get("LED_DAEMON"):
+    pixels = leddaemon.SharedStrip.attach(num_pixels, ORDER)
+else:
+    pixels = hardware.strip(pixel_pin, num_pixels, ORDER)
 
 # stop consol readout of harmless GPIO warnings
 GPIO.setwarnings(False)
@@ -87,849 +138,263 @@ GPIO.output(motorIntNo, GPIO.LOW)
 GPIO.output(motorExtYes, GPIO.LOW)
 GPIO.output(motorExtNo, GPIO.LOW)
 
-# helper function for rainbow_cycle and rainbow_cycle_questions
-def wheel(pos):
-    # Input a value 0 to 255 to get a color value.
-    # The colours are a transition r - g - b - back to r.
-    if pos < 0 or pos > 255:
-        r = g = b = 0
-    elif pos < 85:
-        r = int(pos * 3)
-        g = int(255 - pos * 3)
-        b = 0
-    elif pos < 170:
-        pos -= 85
-        r = int(255 - pos * 3)
-        g = 0
-        b = int(pos * 3)
-    else:
-        pos -= 170
-        r = 0
-        g = int(pos * 3)
-        b = int(255 - pos * 3)
-    return (r, g, b) if ORDER in (neopixel.RGB, neopixel.GRB) else (r, g, b, 0)
+# names show.json uses for the buttons, their lights and the motors
+BUTTONS = {"start": btnStart, "yes": btnYes, "no": btnNo}
+BUTTON_NAMES = {pin: name for name, pin in BUTTONS.items()}
+BUTTON_LIGHTS = {"start": startRelay, "yes": yesRelay, "no": noRelay}
+MOTORS = {"int_yes": motorIntYes, "int_no": motorIntNo, "ext_yes": motorExtYes, "ext_no": motorExtNo}
+
+# question indicator LEDs come first on the chain, then the strand/wheel of accent lights
+SEGMENTS = {
+    "indicators": (0, 10),
+    "strand": (10, num_pixels),
+    "all": (0, num_pixels),
+}
+
+# brightness for the current time of day
+def current_brightness():
+    hour = time.localtime().tm_hour
+    if hour >= NIGHT_START or hour < NIGHT_END:
+        return NIGHT_BRIGHTNESS
+    return BRIGHTNESS
+
+# lights are drawn as layers, top to bottom: emphasis effects, question indicators, rainbow
+compositor = ledlayers.Compositor(pixels, SEGMENTS, ledtransform.Transform(ORDER, current_brightness(), GAMMA))
+rainbow_layer = compositor.add_layer("rainbow", "all", z=0, opaque=True)
+indicator_layer = compositor.add_layer("indicators", "indicators", z=1)
+effect_layer = compositor.add_layer("effects", "all", z=2)
+
+# both rainbow effects rendered once into byte blocks (or loaded from .ledcache/), see ledcache.py
+frame_cache = ledcache.FrameCache()
+strand_rainbow = frame_cache.rainbow(pixels, start=SEGMENTS["strand"][0])
+question_rainbow = frame_cache.rainbow(pixels)
 
-# generates rainbow cycle of colors on LED strand but NOT on the question indicator lights
+# set LED_RECORD=/path/to/file.rec to capture every frame sent to the lights (see ledrecord.py)
+if os.environ.get("LED_RECORD"):
+    compositor.recorder = ledrecord.FrameRecorder(
+        os.environ["LED_RECORD"], num_pixels, ORDER, compositor.transform.brightness, GAMMA
+    )
+
+# target frame rate for the LED render thread
+RENDER_FPS = 100
+
+# the render thread owns the strip from here on, all lighting goes through it (see ledrender.py)
+renderer = ledrender.RenderLoop(compositor, fps=RENDER_FPS)
+renderer.start()
+
+# keeps a rainbow cycle of colors running on the LED strand but NOT on the question indicator lights
+# returns after wait seconds, the animation carries on in the render thread
 def rainbow_cycle(wait):
-    for j in range(255):
-        for i in range(10, num_pixels):
-            pixel_index = (i * 256 // (num_pixels-10)) + j
-            pixels[i] = wheel(pixel_index & 255)
-        pixels.show()
-        time.sleep(wait)
-
-# generates rainbow cycle of colors on LED strand AND LED question indicators
+    if renderer.background_name != "strand":
+        renderer.loop(ledeffects.rainbow(rainbow_layer, strand_rainbow), "strand")
+    time.sleep(wait)
+
+# keeps a rainbow cycle of colors running on the LED strand AND LED question indicators
+# the indicator layer is see-through until an indicator is set
 def rainbow_cycle_questions(wait):
-    for j in range(255):
-        for i in range(num_pixels):
-            pixel_index = (i * 256 // num_pixels) + j
-            pixels[i] = wheel(pixel_index & 255)
-        pixels.show()
-        time.sleep(wait)
+    if renderer.background_name != "questions":
+        renderer.loop(ledeffects.rainbow(rainbow_layer, question_rainbow), "questions")
+    time.sleep(wait)
+
+# seconds between starting a track and hearing it, keeps the lights in step with the sound
+AUDIO_DELAY = MIXER["latency"]
+
+# rainbow whose brightness follows the loudness of a track that was just started, the strand only
+# or with the question indicators; the plain rainbow until the track's envelope has been loaded
+def reactive_rainbow(track, questions=False):
+    sequence = question_rainbow if questions else strand_rainbow
+    envelope = audio_cache.pcm.envelopes.get(track)
+    if envelope is None:
+        if questions:
+            rainbow_cycle_questions(0)
+        else:
+            rainbow_cycle(0)
+        return
+    renderer.loop(ledeffects.reactive_rainbow(rainbow_layer, sequence, envelope, showpcm.ENVELOPE_STEP, AUDIO_DELAY),
+                  track)
 
 # fun effect for emphasis, change 2nd arguement if different color desired
+# plays once on the effects layer over the rainbow and indicators without blocking
+# the first frame sent is marked as the "chase" stage of the latest button press
 def theaterChase(strip, color, wait_ms=50, iterations=10):
-    for j in range(iterations):
-        for q in range(3):
-            for i in range(0, 108, 3):
-                strip[i+q] = color
-            strip.show()
-            time.sleep(wait_ms/1000.0)
-            for i in range(0, 108, 3):
-                strip[i+q] = (0, 0, 0)
-
-#initial preshow settings
-GPIO.add_event_detect(16, GPIO.RISING, bouncetime=5000)
-GPIO.output(startRelay, GPIO.HIGH)
-while True:
-    # wait for start button press
-    rainbow_cycle_questions(0.001)
-    if GPIO.event_detected(16):
-        GPIO.remove_event_detect(16)
-        GPIO.output(startRelay, GPIO.LOW)
-        pygame.mixer.music.load('buttonpress.mp3')
-        pygame.mixer.music.play()
-        theaterChase(pixels, (255, 255 , 255))
-        rainbow_cycle_questions(0.001)
-        break
-# play intro audio
-pygame.mixer.music.load('intro.mp3')
-pygame.mixer.music.play()
-while pygame.mixer.music.get_busy():
-    rainbow_cycle_questions(0.001)
-# ensure all question indicator LEDs are off
-for i in range (10):
-   pixels[i] = (0,0,0)
-   pixels.show()
-# turn on first question indicator LED
-pixels[0] = (255,255,255)
-pixels.show()
-# play question 1
-pygame.mixer.music.load('q1.mp3')
-pygame.mixer.music.play()
-# turn on lights for YES and NO buttons and begin event listening
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-# start timer for question timeout
-epoch = time.time()
-# encapsulate question in try/catch so that StopIteration exception can be used to break out of nested loops
-try:
-    while True:
-       # give 45 seconds per question before timeout and game reset
-        while time.time() - epoch <= 45:
-            # give 30 seconds per question before warning sound plays
-            while time.time() - epoch <= 30:
-                # cycle rainbows (only on LED strand) while waiting for response
-                rainbow_cycle(0.001)
-                # if yes
-                if GPIO.event_detected(19):
-               	    # stop any currently playing sounds in case guest hits button before question audio ends
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    # turn off event detect and YES, NO button lights
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    # fun lights and motors for interior and exterior marble runs
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    # pause to give time for marble conveyance
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    # motors off
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    # force exit outer 'while True' loop to continue with program
-                    raise StopIteration
-                # if no
-                if GPIO.event_detected(13):
-                    # stop any currently playing sounds in case guest hits button before question audio ends
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    # turn off event detect and YES, NO button lights
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-               	    GPIO.remove_event_detect(13)
-               	    GPIO.output(noRelay, GPIO.LOW)
-               	    # fun lights and motors for interior and exterior marble runs
-                    theaterChase(pixels, (255, 255 , 255))
-               	    GPIO.output(motorIntYes, GPIO.HIGH)
-               	    GPIO.output(motorExtYes, GPIO.HIGH)
-               	    # pause to give time for marble conveyance
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    # motors off
-               	    GPIO.output(motorIntYes, GPIO.LOW)
-               	    GPIO.output(motorExtYes, GPIO.LOW)
-               	    # force exit outer 'while True' loop to continue with program
-                    raise StopIteration
-            # play warning audio after 30 seconds of inactivity
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            # continue listening while warning audio plays
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question (< 45 seconds)
-        os.execv(__file__, sys.argv)
-# handle StopIteration exception
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 2
-pixels[1] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q2.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
-    while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 3
-pixels[2] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q3.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
-    while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 4
-pixels[3] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q4.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
-    while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 5
-pixels[4] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q5.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
-    while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 6
-pixels[5] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q6.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
-    while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 7
-pixels[6] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q7.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
-    while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 8
-pixels[7] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q8.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
-    while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# repeat exact same logic for questions 2-9
-# question 9
-pixels[8] = (255,255,255)
-pixels.show()
-rainbow_cycle(0.001)
-pygame.mixer.music.load('q9.mp3')
-pygame.mixer.music.play()
-GPIO.add_event_detect(19, GPIO.RISING, bouncetime=5000)
-GPIO.output(yesRelay, GPIO.HIGH)
-GPIO.add_event_detect(13, GPIO.RISING, bouncetime=5000)
-GPIO.output(noRelay, GPIO.HIGH)
-epoch = time.time()
-try:
+    renderer.play(ledeffects.theater_chase(effect_layer, color, wait_ms, iterations), "effects",
+                  on_shown=tracer.marker("chase"))
+
+# button-to-action latency histograms, kept across restarts in LATENCY_FILE (see showtrace.py)
+# $ kill -USR1 <pid> logs the totals so far (see show below)
+LATENCY_FILE = os.environ.get("SHOW_LATENCY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "latency.json"))
+tracer = showtrace.LatencyTracer(LATENCY_FILE)
+# until the show is running there is nothing to report, and the signal must not end the program
+signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+
+# SHOW_RESTART=exec restarts the whole program after every session, like the show always used to;
+# by default the session is reset in place (see reset_session below)
+RESTART = os.environ.get("SHOW_RESTART", "reset")
+# when the last session ended (time.monotonic(), which is shared across an exec), for the "ready" log
+last_session = {"ended": float(os.environ.get("SHOW_SESSION_ENDED", 0)) or None}
+
+# stop the render thread so the strip is not left mid-frame, then exit or restart the program
+def restart():
+    renderer.stop()
+    tracer.save()
+    if compositor.recorder is not None:
+        compositor.recorder.close()
+    if hardware.once:
+        sys.exit(0)
+    os.environ["SHOW_SESSION_ENDED"] = repr(last_session["ended"])
+    # through the interpreter, so the script does not need its executable bit
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+# software debounce for every button (see showdebounce.py): a press counts once the line was quiet
+# for settle seconds before it and the button is held for min_press seconds; lockout ignores a
+# button for that many seconds after each accepted press
+DEBOUNCE = showdebounce.Settings(settle=0.02, min_press=0.005, lockout=0.0)
+
+# button presses are queued the moment they happen and the show waits on the queue (see showinput.py)
+buttons = showinput.InputQueue(GPIO, tuple(BUTTONS.values()), showdebounce.Debouncer(DEBOUNCE))
+# in sim mode, presses come from a script or the keyboard
+hardware.simulate_buttons(BUTTONS)
+
+# the show runs as a coroutine on an asyncio event loop (see showruntime.py)
+runtime = showruntime.Runtime(buttons, GPIO, audio)
+# when a timer or a press wakes the loop, it waits for the render thread to hand over the
+# interpreter, for up to this long (Python's default is 5 ms)
+sys.setswitchinterval(0.001)
+
+# lights behind a state's audio: "questions" also runs the rainbow over the indicators
+def state_lights(state):
+    if state.args.get("lights") == "questions":
+        rainbow_cycle_questions(0)
+    else:
+        rainbow_cycle(0)
+
+# wait for the start button, then the button sound and a chase
+async def start_phase(state):
+    button = state.args["button"]
+    #initial preshow settings
+    runtime.listen(BUTTONS[button])
+    GPIO.output(BUTTON_LIGHTS[button], GPIO.HIGH)
+    state_lights(state)
+    if last_session["ended"] is not None:
+        logging.info("ready for the next guest %.1f ms after the last session ended",
+                     1000 * (time.monotonic() - last_session["ended"]))
+    tracer.press(state.name, await runtime.press())
+    runtime.ignore(BUTTONS[button])
+    GPIO.output(BUTTON_LIGHTS[button], GPIO.LOW)
+    if "sfx" in state.args:
+        await runtime.play(state.args["sfx"], "sfx")
+        tracer.mark("audio_play")
+    theaterChase(pixels, (255, 255 , 255))
+    return "pressed"
+
+# play a track to the end with the lights following it
+async def play_phase(state):
+    track = state.args["audio"]
+    await runtime.play(track)
+    tracer.mark("next_audio")
+    reactive_rainbow(track, state.args.get("lights") == "questions")
+    await runtime.finished()
+    # move the rainbow back to the strand and ensure all question indicator LEDs are off
+    if state.args.get("indicators_off"):
+        rainbow_cycle(0)
+        for i in range(SEGMENTS["indicators"][1] - SEGMENTS["indicators"][0]):
+            renderer.set_pixel("indicators", i, (0,0,0))
+    return "ended"
+
+# light the question's indicator, play it and wait for an answer, then run the lights and motors
+# plays the warning after warning_timeout seconds, again each time it ends, and gives up after
+# timeout seconds without an answer
+async def question_phase(state):
+    args = state.args
+    renderer.set_pixel("indicators", args["indicator"], (255,255,255))
+    await runtime.play(args["audio"])
+    # from the end of the previous question's motor run (or the start button) to this question's audio
+    tracer.mark("next_audio")
+    reactive_rainbow(args["audio"], args.get("lights") == "questions")
+    # turn on the answer buttons' lights and begin listening
+    answers = [BUTTONS[name] for name in args["answers"]]
+    runtime.listen(*answers)
+    for name in args["answers"]:
+        GPIO.output(BUTTON_LIGHTS[name], GPIO.HIGH)
+    # the warning keeps listening while it plays and repeats until the timeout, like the original
+    # loop; a press calls off both timers at once
+    timeout = runtime.loop.time() + args["timeout"]
+    async def warn():
+        ends = await runtime.play(args["warning"])
+        length = ends - runtime.loop.time()
+        # only start it again if it can finish before the timeout resets the booth
+        while ends + length <= timeout:
+            await runtime.sleep_until(ends, "warning")
+            ends = await runtime.play(args["warning"])
+    warning = runtime.after(args["warning_timeout"], warn, "warning")
+    event = await runtime.press(args["timeout"], "timeout")
+    warning.cancel()
+    if event is None:
+        return "timeout"
+    tracer.press(state.name, event)
+    # stop the narration in case guest hits button before the audio ends
+    if runtime.stop("voice"):
+        tracer.mark("audio_stop")
+    # have the next track ready while the lights and motors run
+    if state.next_audio:
+        runtime.cue(state.next_audio)
+    # stop listening and turn off the answer buttons' lights
+    runtime.ignore(*answers)
+    for name in args["answers"]:
+        GPIO.output(BUTTON_LIGHTS[name], GPIO.LOW)
+    # fun lights and motors for interior and exterior marble runs
+    theaterChase(pixels, (255, 255 , 255))
+    motors = [MOTORS[name] for name in args["motors"].get(BUTTON_NAMES[event.button], ())]
+    running = runtime.pulse(motors, args["motor_seconds"], "motors")
+    tracer.mark("motors")
+    rainbow_cycle(0)
+    # give time for marble conveyance before the next question
+    await running
+    # time the next track from here, the motor run is not latency
+    tracer.resume()
+    return "answered"
+
+PHASES = {"start": start_phase, "play": play_phase, "question": question_phase}
+showscript.check(SHOW, BUTTONS, MOTORS, SEGMENTS["indicators"][1] - SEGMENTS["indicators"][0])
+
+# relays and motor outputs, all off between sessions
+OUTPUTS = (startRelay, yesRelay, noRelay, motorIntYes, motorIntNo, motorExtYes, motorExtNo)
+
+# put the booth back the way a new guest finds it without restarting the program: audio stopped,
+# no buttons listened for, every relay and motor off and the lights blank at the brightness for
+# the time of day; the start phase then turns on the start button and the rainbow
+def reset_session():
+    runtime.reset()
+    for pin in OUTPUTS:
+        GPIO.output(pin, GPIO.LOW)
+    renderer.clear()
+    renderer.set_brightness(current_brightness())
+
+# the show is one pass through the states compiled from show.json per guest, a session ends after
+# the finale or when a question times out
+async def show():
+    runtime.start()
+    # the report runs on the event loop between steps of the show, never in the middle of one that
+    # holds the tracer's lock
+    asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, lambda: logging.info(
+        "button latency:\n%s\ntimer overshoot (ms):\n%s", tracer.dump(), runtime.overshoot_report()))
+    relay_changes = 0
     while True:
-        while time.time() - epoch <= 45:
-            while time.time() - epoch <= 30:
-                rainbow_cycle(0.001)
-                if GPIO.event_detected(19):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-            pygame.mixer.music.load('inactivitywarning.mp3')
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                if GPIO.event_detected(19):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW)
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                if GPIO.event_detected(13):
-                    GPIO.remove_event_detect(19)
-                    GPIO.output(yesRelay, GPIO.LOW)
-                    GPIO.remove_event_detect(13)
-                    GPIO.output(noRelay, GPIO.LOW) 
-                    theaterChase(pixels, (255, 255 , 255))
-                    GPIO.output(motorIntYes, GPIO.HIGH)
-                    GPIO.output(motorExtYes, GPIO.HIGH)
-                    rainbow_cycle(0.001)
-                    time.sleep(MOTOR_DELAY)
-                    GPIO.output(motorIntYes, GPIO.LOW)
-                    GPIO.output(motorExtYes, GPIO.LOW)
-                    raise StopIteration
-                time.sleep(10)
-            time.sleep(0.01)
-        #restart program due to timeout on question
-        os.execv(__file__, sys.argv)
-except StopIteration:
-    pass
-# play final sound clip and restart program
-rainbow_cycle_questions(0.001)
-pygame.mixer.music.load('finale.mp3')
-pygame.mixer.music.play()
-while pygame.mixer.music.get_busy():
-    rainbow_cycle_questions(0.001)
-rainbow_cycle_questions(0.001)
+        state, event = await showscript.run(SHOW, PHASES)
+        last_session["ended"] = time.monotonic()
+        logging.info("session ended: %s %s", state.name, event)
+        logging.info("timer overshoot (ms):\n%s", runtime.overshoot_report())
+        if hardware.simulated:
+            logging.info("%d relay changes this session", len(hardware.relay_log()) - relay_changes)
+            relay_changes = len(hardware.relay_log())
+        if hardware.once or RESTART == "exec":
+            return
+        tracer.save()
+        reset_session()
+
+asyncio.run(show())
 
 #restart program
 pygame.quit()
 GPIO.cleanup()
-os.execv(__file__, sys.argv)
+restart()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# voice/sfx/ambience channels of showaudio.AudioManager driven through showruntime.Runtime, with the
+# silent mixer (fakemixer.py) and simulated GPIO
+# runs the nine answers the way strawberrycough.py does: the answer stops the voice, a sound effect
+# plays, the next track is cued while the "animation" runs and then starts on the voice channel
+# the audio cache is kept small so most tracks have to be decoded again, which shows what cueing
+# saves; effects must never stop the voice channel, every cued track must start within 5 ms, the
+# end of a track must be reported within 20 ms of its length and stopping a track must end a wait
+# for it
+# $ python3 test_scripts/audio_channels_test.py [animation seconds]
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakegpio as GPIO
+import fakemixer as pygame
+import ledpacing
+import showaudio
+import showinput
+import showruntime
+
+LIMIT_MS = 5.0
+END_LIMIT_MS = 20.0
+BTN_YES = 19
+AUDIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+animation = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+
+GPIO.setmode(GPIO.BCM)
+GPIO.setup(BTN_YES, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+buttons = showinput.InputQueue(GPIO, (BTN_YES,))
+
+async def answers(runtime, cue):
+    gaps = []
+    runtime.start()
+    await runtime.play("q1.mp3")
+    for number in range(1, 10):
+        voice = runtime.audio["voice"]
+        # the answer: narration stops, the effect plays on its own channel
+        runtime.stop("voice")
+        await runtime.play("buttonpress.mp3", "sfx")
+        await runtime.play("inactivitywarning.mp3", "voice")
+        await runtime.play("buttonpress.mp3", "sfx")
+        if not voice.get_busy():
+            sys.exit("FAIL: a sound effect stopped the voice channel")
+        runtime.stop("voice")
+        track = "q%d.mp3" % (number + 1) if number < 9 else "finale.mp3"
+        if cue:
+            runtime.cue(track)
+        await asyncio.sleep(animation)
+        started = time.monotonic()
+        await runtime.play(track)
+        gaps.append(time.monotonic() - started)
+    # a track's end arrives as an event, without polling the mixer
+    await runtime.play("buttonpress.mp3", "sfx")
+    started = time.monotonic()
+    await runtime.finished("sfx")
+    late = time.monotonic() - started - runtime.audio.cache.peek("buttonpress.mp3").get_length()
+    if runtime.audio["sfx"].get_busy() or 1000 * abs(late) > END_LIMIT_MS:
+        sys.exit("FAIL: end of track reported %.1f ms off" % (1000 * late))
+    # a wait for the voice ends when another task stops it, not before (the voice was stopped
+    # eighteen times above, none of those ends may count for this track)
+    await runtime.play("q1.mp3")
+    waiting = asyncio.ensure_future(runtime.finished())
+    await asyncio.sleep(0.05)
+    if waiting.done():
+        sys.exit("FAIL: finished() returned while the track was still playing")
+    runtime.stop("voice")
+    try:
+        await asyncio.wait_for(waiting, 0.02)
+    except asyncio.TimeoutError:
+        sys.exit("FAIL: finished() kept waiting after the track was stopped")
+    return gaps
+
+def run(cue):
+    # room for a few tracks, so the next question is rarely still in memory
+    cache = showaudio.SoundCache(pygame, AUDIO_DIR, budget=3 * 1024 * 1024)
+    runtime = showruntime.Runtime(buttons, GPIO, showaudio.AudioManager(pygame, cache))
+    gaps = asyncio.run(answers(runtime, cue))
+    gaps.sort()
+    print("%-9s answer-to-question gap p50 %.3f max %.3f ms, cache %s"
+          % ("cued" if cue else "not cued", 1000 * ledpacing.percentile(gaps, 0.5), 1000 * gaps[-1], cache.stats()))
+    return gaps
+
+run(False)
+gaps = run(True)
+if 1000 * gaps[-1] > LIMIT_MS:
+    sys.exit("FAIL: a cued track took longer than %.0f ms to start" % LIMIT_MS)
+print("effects never stopped the voice, cued tracks started within %.0f ms and track ends arrived within %.0f ms"
+      % (LIMIT_MS, END_LIMIT_MS))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# loudness envelopes (showpcm.py) driving the audio-reactive rainbow (ledeffects.reactive_rainbow)
+# a synthetic 44.1 kHz stereo tone that swells and fades stands in for a decoded track, so no mp3
+# decoder is needed; checks the numpy and pure Python envelopes agree, that the strand's brightness
+# follows the envelope, and that the per-frame cost stays close to the plain rainbow's and a small
+# share of a frame at the render thread's default rate
+# $ python3 test_scripts/audio_envelope_test.py [seconds of audio]
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ledcache
+import ledeffects
+import ledlayers
+import ledrender
+import showpcm
+from fakepixels import FakeNeoPixel
+
+FREQUENCY = 44100
+FRAMES = 5000
+# the reactive rainbow may cost this many times the plain one, and this share of a frame
+MAX_RATIO = 4.0
+MAX_SHARE = 0.02
+
+seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+
+# loudness rises to full at half way and falls back to silence
+count = int(seconds * FREQUENCY)
+samples = bytearray()
+for i in range(count):
+    v = int(30000 * math.sin(math.pi * i / count) * math.sin(2 * math.pi * 440 * i / FREQUENCY))
+    samples += v.to_bytes(2, "little", signed=True) * 2
+
+begin = time.perf_counter()
+envelope = showpcm.envelope(samples, FREQUENCY, -16, 2)
+vectorized = time.perf_counter() - begin
+numpy, showpcm.numpy = showpcm.numpy, None
+begin = time.perf_counter()
+fallback = showpcm.envelope(samples, FREQUENCY, -16, 2)
+plain = time.perf_counter() - begin
+showpcm.numpy = numpy
+print("%d envelope bytes for %.1f s of audio: numpy %.1f ms, pure Python %.1f ms"
+      % (len(envelope), seconds, 1000 * vectorized, 1000 * plain))
+if numpy is not None and max(abs(a - b) for a, b in zip(envelope, fallback)) > 1:
+    sys.exit("FAIL: numpy and pure Python envelopes differ")
+if envelope[len(envelope) // 2] < 250 or envelope[0] > 5:
+    sys.exit("FAIL: envelope does not follow the swell")
+
+pixels = FakeNeoPixel(110)
+compositor = ledlayers.Compositor(pixels, {"all": (0, 110)})
+layer = compositor.add_layer("rainbow", "all", z=0, opaque=True)
+sequence = ledcache.FrameCache(use_disk=False).rainbow(pixels)
+
+def brightness_at(t):
+    effect = ledeffects.reactive_rainbow(layer, sequence, envelope)
+    next(effect)
+    effect.send(t)
+    return sum(layer.buf) / sum(sequence.frame(round(t * ledeffects.RAINBOW_STEPS_PER_SECOND)))
+
+quiet, loud = brightness_at(0.0), brightness_at(seconds / 2)
+print("strand brightness at the start %.2f, at the peak %.2f" % (quiet, loud))
+if abs(quiet - ledeffects.REACTIVE_FLOOR) > 0.02 or loud < 0.98:
+    sys.exit("FAIL: brightness does not follow the envelope")
+
+def frame_cost(effect):
+    next(effect)
+    begin = time.perf_counter()
+    for n in range(FRAMES):
+        effect.send(n * seconds / FRAMES)
+    return (time.perf_counter() - begin) / FRAMES
+
+base = frame_cost(ledeffects.rainbow(layer, sequence))
+reactive = frame_cost(ledeffects.reactive_rainbow(layer, sequence, envelope))
+print("per frame: rainbow %.1f us, reactive rainbow %.1f us" % (1e6 * base, 1e6 * reactive))
+budget = MAX_SHARE / ledrender.DEFAULT_FPS
+if reactive > MAX_RATIO * base or reactive > budget:
+    sys.exit("FAIL: the reactive rainbow costs %.1f us per frame, over %.0fx the rainbow or %.0f us"
+             % (1e6 * reactive, MAX_RATIO, 1e6 * budget))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# feeds synthetic bouncy edge trains through the simulated GPIO into the input queue and its
+# software debounce (showdebounce.py), and checks how many presses come out of each
+# the chatter case toggles a button 1000 times a second and must wake the show at most once
+# python threads can stall the feeder for longer than the settle window, which really is a quiet
+# line followed by a new press; such stalls are counted and allowed for
+# $ python3 test_scripts/debounce_test.py
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakegpio as GPIO
+import showdebounce
+import showinput
+
+BUTTON = 19
+
+# a train is a list of (seconds to wait, level to set)
+def clean(hold=0.05):
+    return [(0.0, 1), (hold, 0)]
+
+def bouncy(hold=0.08, bounces=8, gap=0.0003):
+    train = [(0.0, 1)]
+    for i in range(bounces):
+        train += [(gap, 0), (gap, 1)]
+    train.append((hold, 0))
+    for i in range(bounces):
+        train += [(gap, 1), (gap, 0)]
+    return train
+
+def chatter(seconds=1.0, gap=0.001):
+    train = []
+    level = 0
+    for i in range(int(seconds / gap)):
+        level = 1 - level
+        train.append((gap, level))
+    return train + [(gap, 0)]
+
+def random_chatter(seconds=0.5):
+    train = []
+    level = 0
+    elapsed = 0.0
+    while elapsed < seconds:
+        gap = random.uniform(0.0002, 0.004)
+        elapsed += gap
+        level = 1 - level
+        train.append((gap, level))
+    return train + [(0.001, 0)]
+
+# name, edge train, debounce settings, listening, allowed number of presses
+CASES = [
+    ("clean press", clean(), showdebounce.DEFAULT, True, (1, 1)),
+    ("bouncy press", bouncy(), showdebounce.DEFAULT, True, (1, 1)),
+    ("1 ms glitch", clean(0.001), showdebounce.DEFAULT, True, (0, 0)),
+    ("tap shorter than min_press", clean(0.002), showdebounce.Settings(0.02, 0.02, 0.0), True, (0, 0)),
+    ("two presses", clean() + [(0.1, 1), (0.05, 0)], showdebounce.DEFAULT, True, (2, 2)),
+    ("two presses, 0.5 s lockout", clean() + [(0.1, 1), (0.05, 0)], showdebounce.Settings(0.02, 0.005, 0.5), True, (1, 1)),
+    ("bouncy press, not listening", bouncy(), showdebounce.DEFAULT, False, (0, 0)),
+    ("1 kHz chatter", chatter(), showdebounce.DEFAULT, True, (0, 1)),
+    ("random chatter", random_chatter(), showdebounce.DEFAULT, True, (0, 1)),
+]
+
+def feed(train, times):
+    for wait, level in train:
+        if wait:
+            time.sleep(wait)
+        times.append(time.monotonic())
+        GPIO.set_input(BUTTON, level)
+
+def run(name, train, settings, listening, allowed):
+    buttons = showinput.InputQueue(GPIO, (BUTTON,), showdebounce.Debouncer(settings))
+    if listening:
+        buttons.listen(BUTTON)
+    times = []
+    feeder = threading.Thread(target=feed, args=(train, times))
+    started = time.monotonic()
+    feeder.start()
+    presses = []
+    while feeder.is_alive() or not buttons.events.empty():
+        event = buttons.wait(0.05)
+        if event is not None:
+            presses.append(time.monotonic() - event.time)
+    feeder.join()
+    event = buttons.wait(0.05)
+    if event is not None:
+        presses.append(time.monotonic() - event.time)
+    buttons.close()
+    # gaps in the chatter cases long enough to count as a settled line
+    stalls = 0
+    if allowed[0] != allowed[1]:
+        stalls = sum(1 for a, b in zip(times, times[1:]) if b - a >= settings.settle)
+    ok = (allowed[0] <= len(presses) <= allowed[1] + stalls
+          and buttons.candidates <= max(allowed[1], 1) + stalls)
+    stats = buttons.debounce.stats().get(BUTTON, {})
+    print("%-30s %5d edges in %5.2f s  %d stalls  %2d wakeups  %2d presses  %s  %s"
+          % (name, len(train), time.monotonic() - started, stalls, buttons.candidates, len(presses),
+             "latency " + ", ".join("%.1f ms" % (1000 * p) for p in presses) if presses else "",
+             "ok" if ok else "FAIL (expected %d-%d presses, %d rejected)" % (allowed[0], allowed[1], stats.get("rejected", 0))))
+    return ok
+
+if __name__ == "__main__":
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(BUTTON, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+    results = [run(*case) for case in CASES]
+    if not all(results):
+        sys.exit(1)
+    print("all cases passed")
@@ -0,0 +1,45 @@
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# the booth's lights for the test scripts: the layers strawberrycough.py draws on (rainbow,
+# question indicators, effects) over the in-memory strip, or any other strip-like object such as
+# leddaemon.SharedStrip, with the LED render thread in front of them
+#
+#     import fakebooth
+#     lights = fakebooth.Lights()
+#     lights.start()            # render thread running the strand rainbow
+#     ...
+#     lights.renderer.stop()
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ledcache
+import ledeffects
+import ledlayers
+import ledrender
+import ledtransform
+from fakepixels import FakeNeoPixel
+
+NUM_PIXELS = 110
+SEGMENTS = {"indicators": (0, 10), "strand": (10, NUM_PIXELS), "all": (0, NUM_PIXELS)}
+
+class Lights:
+    # strip defaults to a FakeNeoPixel that takes as long to show() as a real strand
+    def __init__(self, strip=None, fps=ledrender.DEFAULT_FPS, brightness=0.5):
+        self.pixels = strip if strip is not None else FakeNeoPixel(NUM_PIXELS, wire_time=True)
+        self.compositor = ledlayers.Compositor(self.pixels, SEGMENTS, ledtransform.Transform(brightness=brightness))
+        self.rainbow = self.compositor.add_layer("rainbow", "all", z=0, opaque=True)
+        self.indicators = self.compositor.add_layer("indicators", "indicators", z=1)
+        self.effects = self.compositor.add_layer("effects", "all", z=2)
+        self.renderer = ledrender.RenderLoop(self.compositor, fps=fps)
+        self.cache = ledcache.FrameCache(use_disk=False)
+
+    # start the render thread with the rainbow on the strand, or on every pixel with questions
+    def start(self, questions=False):
+        self.renderer.start()
+        sequence = self.cache.rainbow(self.pixels, start=0 if questions else SEGMENTS["strand"][0])
+        self.renderer.loop(ledeffects.rainbow(self.rainbow, sequence), "questions" if questions else "strand")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# button-to-reaction latency of the input queue, with simulated GPIO and the LED render thread
+# running against the in-memory strip
+# a press thread pushes buttons at random moments while the show side waits the way
+# strawberrycough.py does (listen, wait with a timeout, react, ignore); every press must be seen
+# within 20 ms (debounce included), including presses that land during a timeout wait
+# the per-stage latency histograms from showtrace.py are printed at the end
+# $ python3 test_scripts/input_latency_test.py [presses]
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakebooth
+import fakegpio as GPIO
+import ledeffects
+import ledpacing
+import showinput
+import showtrace
+
+LIMIT_MS = 20.0
+BTN_YES = 19
+BTN_NO = 13
+
+presses = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+GPIO.setmode(GPIO.BCM)
+for pin in (BTN_YES, BTN_NO):
+    GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+buttons = showinput.InputQueue(GPIO, (BTN_YES, BTN_NO))
+
+lights = fakebooth.Lights()
+renderer = lights.renderer
+lights.start(questions=True)
+
+pressed = []
+
+def press_buttons():
+    for n in range(presses):
+        time.sleep(random.uniform(0.02, 0.15))
+        pressed.append(time.monotonic())
+        GPIO.press(random.choice((BTN_YES, BTN_NO)), duration=0.02)
+
+tracer = showtrace.LatencyTracer()
+latencies = []
+timeouts = 0
+presser = threading.Thread(target=press_buttons)
+buttons.listen(BTN_YES, BTN_NO)
+presser.start()
+while len(latencies) < presses:
+    # short timeouts so some presses arrive while the show is between waits
+    event = buttons.wait(random.uniform(0.01, 0.1))
+    if event is None:
+        timeouts += 1
+        continue
+    latencies.append(time.monotonic() - pressed[len(latencies)])
+    tracer.press("YES" if event.button == BTN_YES else "NO", event)
+    renderer.play(ledeffects.theater_chase(lights.effects, (255, 255, 255), iterations=1), "effects",
+                  on_shown=tracer.marker("chase"))
+presser.join()
+renderer.stop()
+
+latencies.sort()
+print("%d presses, %d timed-out waits, latency p50 %.3f p99 %.3f max %.3f ms"
+      % (len(latencies), timeouts, 1000 * ledpacing.percentile(latencies, 0.5),
+         1000 * ledpacing.percentile(latencies, 0.99), 1000 * latencies[-1]))
+print(renderer.pacer.summary())
+print(tracer.dump())
+if 1000 * latencies[-1] > LIMIT_MS:
+    sys.exit("FAIL: slowest press took longer than %.0f ms" % LIMIT_MS)
+print("all presses handled within %.0f ms" % LIMIT_MS)
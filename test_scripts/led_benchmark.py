@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# benchmark suite for the LED pipeline, runs against the in-memory strip in fakepixels.py
+# for every effect and strip length it reports frames/sec, cpu time per frame, bytes allocated per
+# frame, show() calls and bytes sent to the strip, and writes everything to a json file
+#
+# $ python3 test_scripts/led_benchmark.py                          # writes led_benchmark.json
+# $ python3 test_scripts/led_benchmark.py --baseline old.json      # exit 1 on a regression
+#
+# a case regresses when its frames/sec drops by more than --threshold (default 20%) of the baseline
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ledcache
+import ledeffects
+import ledframes
+import ledlayers
+import ledtransform
+from fakepixels import FakeNeoPixel
+
+PIXEL_COUNTS = (110, 500, 2000)
+BRIGHTNESS = 0.5
+ORDER = "GRB"
+# simulated frame rate used to turn frame numbers into effect time
+FPS = 100
+
+# the strip, compositor and layers the show uses, for a strip of num_pixels
+def build(num_pixels):
+    pixels = FakeNeoPixel(num_pixels, pixel_order=ORDER)
+    segments = {"indicators": (0, 10), "strand": (10, num_pixels), "all": (0, num_pixels)}
+    compositor = ledlayers.Compositor(pixels, segments, ledtransform.Transform(ORDER, BRIGHTNESS))
+    layers = {
+        "rainbow": compositor.add_layer("rainbow", "all", z=0, opaque=True),
+        "indicators": compositor.add_layer("indicators", "indicators", z=1),
+        "effects": compositor.add_layer("effects", "all", z=2),
+    }
+    return pixels, compositor, layers
+
+# the original per-pixel wheel() rainbow, one strip write per pixel
+def wheel_case(num_pixels):
+    pixels = FakeNeoPixel(num_pixels, brightness=BRIGHTNESS, pixel_order=ORDER)
+    def frame(n):
+        j = n % ledframes.RAINBOW_STEPS
+        for i in range(10, num_pixels):
+            pixels[i] = ledframes.wheel((i * 256 // (num_pixels - 10) + j) & 255)
+        pixels.show()
+    return pixels, frame
+
+def effect_case(num_pixels, make):
+    pixels, compositor, layers = build(num_pixels)
+    effect = ledeffects.Running(make(pixels, layers), 0.0)
+    def frame(n):
+        if not effect.advance(n / FPS):
+            # finite effects start over so every frame measures real work
+            effect.__init__(make(pixels, layers), n / FPS)
+            effect.advance(n / FPS)
+        compositor.push()
+    return pixels, frame
+
+def rainbow_cycle_case(num_pixels):
+    cache = ledcache.FrameCache(use_disk=False)
+    return effect_case(num_pixels, lambda pixels, layers: ledeffects.rainbow(
+        layers["rainbow"], cache.rainbow(pixels, start=10)))
+
+def rainbow_cycle_questions_case(num_pixels):
+    cache = ledcache.FrameCache(use_disk=False)
+    return effect_case(num_pixels, lambda pixels, layers: ledeffects.rainbow(
+        layers["rainbow"], cache.rainbow(pixels)))
+
+def theater_chase_case(num_pixels):
+    return effect_case(num_pixels, lambda pixels, layers: ledeffects.theater_chase(
+        layers["effects"], (255, 255, 255)))
+
+CASES = {
+    "wheel": wheel_case,
+    "rainbow_cycle": rainbow_cycle_case,
+    "rainbow_cycle_questions": rainbow_cycle_questions_case,
+    "theaterChase": theater_chase_case,
+}
+
+def run_case(setup, num_pixels, frames):
+    pixels, frame = setup(num_pixels)
+    # warm up caches and the first frame outside the measurement
+    frame(0)
+    shows = pixels.show_count
+    written = pixels.bytes_written
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for n in range(1, frames + 1):
+        frame(n)
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    shows = pixels.show_count - shows
+    written = pixels.bytes_written - written
+    # second pass under tracemalloc for the peak bytes allocated inside a frame
+    tracemalloc.start()
+    allocated = 0
+    for n in range(frames + 1, 2 * frames + 1):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        frame(n)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return {
+        "pixels": num_pixels,
+        "frames": frames,
+        "fps": frames / wall,
+        "cpu_ms_per_frame": 1000.0 * cpu / frames,
+        "alloc_bytes_per_frame": allocated / frames,
+        "shows": shows,
+        "bytes_written": written,
+    }
+
+# list of "case@pixels" keys whose fps fell by more than threshold
+def regressions(results, baseline, threshold):
+    old = {"%s@%d" % (r["effect"], r["pixels"]): r for r in baseline["results"]}
+    slower = []
+    for r in results:
+        key = "%s@%d" % (r["effect"], r["pixels"])
+        if key in old and r["fps"] < old[key]["fps"] * (1.0 - threshold):
+            slower.append("%s %.0f -> %.0f fps" % (key, old[key]["fps"], r["fps"]))
+    return slower
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LED pipeline benchmark against a fake NeoPixel strip")
+    parser.add_argument("--frames", type=int, default=300, help="frames per case")
+    parser.add_argument("--output", default="led_benchmark.json", help="json file for the results")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed fractional fps drop")
+    parser.add_argument("--effects", nargs="*", default=list(CASES), choices=list(CASES))
+    args = parser.parse_args()
+
+    results = []
+    for name in args.effects:
+        for num_pixels in PIXEL_COUNTS:
+            result = run_case(CASES[name], num_pixels, args.frames)
+            result["effect"] = name
+            results.append(result)
+            print("%-24s %5d px  %9.0f fps  %7.3f ms cpu  %9.0f B alloc  %5d show()  %9d B sent"
+                  % (name, num_pixels, result["fps"], result["cpu_ms_per_frame"],
+                     result["alloc_bytes_per_frame"], result["shows"], result["bytes_written"]))
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": ledframes.numpy is not None,
+        "threshold": args.threshold,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("results written to %s" % args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.threshold)
+        for line in slower:
+            print("REGRESSION %s" % line)
+        if slower:
+            sys.exit(1)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# blends and crossfades of LED effects (ledeffects.blend, crossfade, solid) on the booth's layers
+# runs a solid color and the rainbow each on their own layer as references and checks that a
+# blend at 0 and 1 shows one of them, that the frame half way through a crossfade is mix() of both
+# at that moment, and that the crossfade ends on the rainbow and keeps animating it; numpy and the
+# pure Python mix() must agree
+# $ python3 test_scripts/led_blend_test.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakebooth
+import ledeffects
+
+FADE = 1.0
+
+lights = fakebooth.Lights()
+layer = lights.rainbow
+sequence = lights.cache.rainbow(lights.pixels)
+first = layer.start * layer.bpp
+last = layer.stop * layer.bpp
+
+def make_a(l):
+    return ledeffects.solid(l, (255, 0, 0))
+
+def make_b(l):
+    return ledeffects.rainbow(l, sequence)
+
+# what an effect draws on a layer of its own at time t
+def reference(make, t):
+    target = layer.offscreen()
+    effect = make(target)
+    next(effect)
+    effect.send(t)
+    return bytes(target.buf[first:last])
+
+def drawn():
+    return bytes(layer.buf[first:last])
+
+def run(effect, times):
+    next(effect)
+    for t in times:
+        effect.send(t)
+
+t = 0.37
+run(ledeffects.blend(layer, make_a, make_b, 0.0), [t])
+if drawn() != reference(make_a, t):
+    sys.exit("FAIL: a blend at 0.0 does not show effect a")
+run(ledeffects.blend(layer, make_a, make_b, 1.0), [t])
+if drawn() != reference(make_b, t):
+    sys.exit("FAIL: a blend at 1.0 does not show effect b")
+
+half = FADE / 2
+run(ledeffects.crossfade(layer, make_a, make_b, FADE), [0.0, 0.25, half])
+expected = ledeffects.mix(reference(make_a, half), reference(make_b, half), half / FADE)
+if drawn() != expected:
+    sys.exit("FAIL: the frame half way through the crossfade is not mix() of both effects")
+print("half way: %d of %d bytes differ from the rainbow" % (
+    sum(1 for x, y in zip(drawn(), reference(make_b, half)) if x != y), last - first))
+
+fade = ledeffects.crossfade(layer, make_a, make_b, FADE)
+run(fade, [0.0, half, FADE, FADE + 0.5])
+if drawn() != reference(make_b, FADE + 0.5):
+    sys.exit("FAIL: the crossfade did not end on effect b")
+fade.send(FADE + 1.0)
+if drawn() != reference(make_b, FADE + 1.0):
+    sys.exit("FAIL: effect b stopped running after the crossfade")
+
+if ledeffects.numpy is not None:
+    a, b = reference(make_a, half), reference(make_b, half)
+    vectorized = ledeffects.mix(a, b, 0.3)
+    numpy, ledeffects.numpy = ledeffects.numpy, None
+    plain = ledeffects.mix(a, b, 0.3)
+    ledeffects.numpy = numpy
+    if max(abs(x - y) for x, y in zip(vectorized, plain)) > 1:
+        sys.exit("FAIL: numpy and pure Python mix() differ")
+print("blend and crossfade ok")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# runs the LED daemon loop in a child process against the in-memory strip, drives it from this
+# process through the shared-memory ring like the show would, and checks the last frame made it
+# $ python3 test_scripts/led_daemon_test.py [seconds]
+
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakebooth
+import leddaemon
+from fakepixels import FakeNeoPixel
+
+NUM_PIXELS = fakebooth.NUM_PIXELS
+SHM_NAME = "sg-hooked-leds-test"
+
+def daemon(ready, results):
+    strip = FakeNeoPixel(NUM_PIXELS, wire_time=True)
+    ring = leddaemon.FrameRing.create(NUM_PIXELS, name=SHM_NAME)
+    ready.set()
+    try:
+        leddaemon.serve(strip, ring)
+    finally:
+        results.put((strip.show_count, strip.last_frame))
+        ring.close()
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    ready = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    child = multiprocessing.Process(target=daemon, args=(ready, results))
+    child.start()
+    ready.wait()
+
+    pixels = leddaemon.SharedStrip.attach(NUM_PIXELS, name=SHM_NAME)
+    lights = fakebooth.Lights(pixels)
+    renderer = lights.renderer
+    lights.start(questions=True)
+    time.sleep(seconds)
+    renderer.stop()
+    written = pixels.ring.sequence
+    sent = bytes(pixels._post_brightness_buffer)
+
+    # let the daemon pick up the last frame before stopping it
+    time.sleep(0.1)
+    os.kill(child.pid, signal.SIGTERM)
+    shown, last_frame = results.get()
+    child.join()
+    pixels.deinit()
+
+    print("frames written to the ring: %d, shown by the daemon: %d" % (written, shown))
+    print(renderer.pacer.summary())
+    if last_frame != sent:
+        sys.exit("FAIL: the daemon's last frame differs from the show's")
+    print("last frame matches")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# frame recordings (ledrecord.py) of the LED render thread against the in-memory strip
+# records a short run of the rainbow and a theater chase with the brightness changed half way, the
+# way reset_session() changes it between guests, and checks that
+#   FrameRecording.play() sends the strip exactly the frames the show sent, at their brightness
+#   replaying the recording into a second booth with ledeffects.playback() records it again with
+#   no diff() against the first, and diff() does notice when the replay ignores the brightness
+# $ python3 test_scripts/led_record_test.py [seconds]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakebooth
+import ledeffects
+import ledrecord
+from fakepixels import FakeNeoPixel
+
+BRIGHTNESS = 0.5
+DIMMED = 0.2
+
+seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+# keeps a copy of every frame sent to it
+class CapturingStrip(FakeNeoPixel):
+    def __init__(self, n):
+        super().__init__(n)
+        self.frames = []
+
+    def show(self):
+        super().show()
+        self.frames.append(self.last_frame)
+
+# record the run
+def record(path):
+    lights = fakebooth.Lights(CapturingStrip(fakebooth.NUM_PIXELS), brightness=BRIGHTNESS)
+    lights.compositor.recorder = ledrecord.FrameRecorder(path, fakebooth.NUM_PIXELS, lights.pixels.byteorder,
+                                                         BRIGHTNESS)
+    lights.start()
+    lights.renderer.play(ledeffects.theater_chase(lights.effects, (255, 255, 255), iterations=2), "effects")
+    time.sleep(seconds / 2)
+    lights.renderer.set_brightness(DIMMED)
+    time.sleep(seconds / 2)
+    lights.renderer.stop()
+    lights.compositor.recorder.close()
+    return lights.pixels.frames
+
+# replay a recording into a second booth frame by frame and record that, following the recorded
+# brightness unless fixed is given
+def rerecord(recording, path, fixed=None):
+    lights = fakebooth.Lights(CapturingStrip(fakebooth.NUM_PIXELS), brightness=BRIGHTNESS)
+    compositor = lights.compositor
+    compositor.recorder = ledrecord.FrameRecorder(path, fakebooth.NUM_PIXELS, lights.pixels.byteorder, BRIGHTNESS)
+    effect = ledeffects.playback(lights.rainbow, recording)
+    next(effect)
+    for i, t in enumerate(recording.timestamps):
+        brightness = recording.levels[i][0] if fixed is None else fixed
+        if brightness != compositor.transform.brightness:
+            compositor.set_brightness(brightness)
+        effect.send(t)
+        compositor.prepare()
+        compositor.show()
+    compositor.recorder.close()
+    return ledrecord.FrameRecording(path)
+
+directory = tempfile.mkdtemp(prefix="led-record-test-")
+try:
+    shown = record(os.path.join(directory, "show.rec"))
+    recording = ledrecord.FrameRecording(os.path.join(directory, "show.rec"))
+    levels = sorted(set(b for b, g in recording.levels))
+    print("%d frames over %.2f s at brightness %s" % (len(recording), recording.duration,
+                                                      ", ".join("%.1f" % b for b in levels)))
+    if len(recording) != len(shown):
+        sys.exit("FAIL: %d frames recorded, %d shown" % (len(recording), len(shown)))
+    if levels != [DIMMED, BRIGHTNESS]:
+        sys.exit("FAIL: the brightness change is not in the recording")
+
+    strip = CapturingStrip(fakebooth.NUM_PIXELS)
+    recording.play(strip, speed=100.0)
+    wrong = [i for i, (a, b) in enumerate(zip(strip.frames, shown)) if a != b]
+    if len(strip.frames) != len(shown) or wrong:
+        sys.exit("FAIL: play() sent %d frames, %d differ from the show's, first %s"
+                 % (len(strip.frames), len(wrong), wrong[:5]))
+    print("play() sent the same %d frames as the show" % len(shown))
+
+    replayed = rerecord(recording, os.path.join(directory, "replay.rec"))
+    changes = ledrecord.diff(recording, replayed)
+    if changes or len(replayed) != len(recording):
+        sys.exit("FAIL: the replay differs from the recording: %d vs %d frames, %s"
+                 % (len(replayed), len(recording), changes[:3]))
+    print("replayed recording is identical, %d frames" % len(replayed))
+
+    undimmed = rerecord(recording, os.path.join(directory, "undimmed.rec"), fixed=BRIGHTNESS)
+    if not ledrecord.diff(recording, undimmed):
+        sys.exit("FAIL: diff() missed a replay at the wrong brightness")
+    print("diff() catches a replay at the wrong brightness from frame %d" % ledrecord.diff(recording, undimmed)[0][0])
+    for r in (recording, replayed, undimmed):
+        r.close()
+finally:
+    shutil.rmtree(directory)
+print("frame recording ok")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# compares the original per-pixel wheel() rainbow loops with the precomputed frames in ledframes.py
+# and the rendered-once frame blocks in ledcache.py
+# runs against an in-memory strip, no Pi or LEDs needed:
+# $ python3 test_scripts/rainbow_benchmark.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ledcache
+import ledframes
+from fakepixels import FakeNeoPixel
+
+num_pixels = 110
+ORDER = "GRB"
+BRIGHTNESS = 0.5
+CYCLES = 4
+
+# original helper from strawberrycough.py, kept here as the reference output
+def wheel(pos):
+    if pos < 0 or pos > 255:
+        r = g = b = 0
+    elif pos < 85:
+        r = int(pos * 3)
+        g = int(255 - pos * 3)
+        b = 0
+    elif pos < 170:
+        pos -= 85
+        r = int(255 - pos * 3)
+        g = 0
+        b = int(pos * 3)
+    else:
+        pos -= 170
+        r = 0
+        g = int(pos * 3)
+        b = int(255 - pos * 3)
+    return (r, g, b) if ORDER in ("RGB", "GRB") else (r, g, b, 0)
+
+# one frame of the original loop, start=10 for rainbow_cycle and start=0 for rainbow_cycle_questions
+def legacy_frame(pixels, j, start):
+    for i in range(start, num_pixels):
+        pixel_index = (i * 256 // (num_pixels - start)) + j
+        pixels[i] = wheel(pixel_index & 255)
+
+# check every frame of both variants is byte-identical to the original loop
+def check(start):
+    legacy = FakeNeoPixel(num_pixels, brightness=BRIGHTNESS, pixel_order=ORDER)
+    fast = FakeNeoPixel(num_pixels, brightness=BRIGHTNESS, pixel_order=ORDER)
+    cached = FakeNeoPixel(num_pixels, brightness=BRIGHTNESS, pixel_order=ORDER)
+    frames = ledframes.RainbowFrames.for_strip(fast, start)
+    sequence = ledcache.FrameCache(use_disk=False).rainbow(cached, start)
+    for j in range(ledframes.RAINBOW_STEPS):
+        legacy_frame(legacy, j, start)
+        frames.render(fast, j)
+        sequence.render(cached, j)
+        legacy.show()
+        fast.show()
+        cached.show()
+        if legacy.last_frame != fast.last_frame or legacy.last_frame != cached.last_frame:
+            raise SystemExit("frame %d differs for start=%d" % (j, start))
+        if legacy._pre_brightness_buffer != fast._pre_brightness_buffer:
+            raise SystemExit("unscaled buffer %d differs for start=%d" % (j, start))
+
+def frames_per_second(step):
+    pixels = FakeNeoPixel(num_pixels, brightness=BRIGHTNESS, pixel_order=ORDER)
+    count = CYCLES * ledframes.RAINBOW_STEPS
+    begin = time.perf_counter()
+    for n in range(count):
+        step(pixels, n % ledframes.RAINBOW_STEPS)
+        pixels.show()
+    return count / (time.perf_counter() - begin)
+
+if __name__ == "__main__":
+    print("numpy: %s" % ("yes" if ledframes.numpy is not None else "no"))
+    for start, name in ((10, "rainbow_cycle"), (0, "rainbow_cycle_questions")):
+        check(start)
+        frames = ledframes.RainbowFrames(num_pixels, start, ORDER, BRIGHTNESS)
+        before = frames_per_second(lambda pixels, j: legacy_frame(pixels, j, start))
+        after = frames_per_second(frames.render)
+        sequence = ledcache.FrameCache(use_disk=False).rainbow(FakeNeoPixel(num_pixels, BRIGHTNESS, pixel_order=ORDER), start)
+        cached = frames_per_second(sequence.render)
+        print("%-24s identical  wheel(): %8.0f fps  palette: %8.0f fps  cache: %8.0f fps  (%d bytes)"
+              % (name, before, after, cached, sequence.size))
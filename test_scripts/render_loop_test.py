@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# runs the LED render thread against an in-memory strip and checks its frame timing
+# commands from the show logic must return immediately while the animation keeps going, the
+# render thread must keep its frame rate without dropping more than a few frames, static
+# indicators must not call show() at all, a command must be drawn without waiting for the next
+# frame, a brightness change must resend the frame once and a changed indicator must only
+# recomposite its own pixel
+# $ python3 test_scripts/render_loop_test.py [fps]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakebooth
+import ledeffects
+import ledrender
+
+# a command must be queued within this many ms
+HANDOFF_MS = 5.0
+# share of the target frame rate the thread must reach, and of its frames it may drop
+MIN_FPS = 0.9
+MAX_DROPPED = 0.05
+
+fps = int(sys.argv[1]) if len(sys.argv) > 1 else ledrender.DEFAULT_FPS
+
+lights = fakebooth.Lights(fps=fps)
+pixels, compositor, renderer = lights.pixels, lights.compositor, lights.renderer
+lights.start()
+for i in range(10):
+    renderer.set_pixel("indicators", i, (0, 0, 0))
+renderer.set_pixel("indicators", 0, (255, 255, 255))
+
+# a button press in the show: the chase is handed over and control comes straight back
+begin = time.monotonic()
+renderer.play(ledeffects.theater_chase(lights.effects, (255, 255, 255)), "effects")
+handoff = 1000 * (time.monotonic() - begin)
+print("theater_chase handed off in %.3f ms" % handoff)
+if handoff > HANDOFF_MS:
+    sys.exit("FAIL: handing off the chase took longer than %.0f ms" % HANDOFF_MS)
+
+for n in range(3):
+    time.sleep(1)
+    print(renderer.stats())
+stats = renderer.stats()
+if stats["fps"] < MIN_FPS * fps:
+    sys.exit("FAIL: %.1f fps, below %.0f%% of %d" % (stats["fps"], 100 * MIN_FPS, fps))
+if stats["dropped"] > MAX_DROPPED * stats["frames"]:
+    sys.exit("FAIL: %d of %d frames dropped" % (stats["dropped"], stats["frames"]))
+if stats["frame_p95_ms"] > stats["budget_ms"]:
+    sys.exit("FAIL: frame p95 %.2f ms is over the %.2f ms budget" % (stats["frame_p95_ms"], stats["budget_ms"]))
+# every frame the compositor pushed was timed and reached the strip
+if stats["shows"] != compositor.pushes or compositor.pushes != pixels.show_count:
+    sys.exit("FAIL: %d timed show() calls, %d pushes, %d frames on the strip"
+             % (stats["shows"], compositor.pushes, pixels.show_count))
+
+# with only the indicators left, frames stop changing and show() is no longer called
+renderer.clear()
+renderer.set_pixel("indicators", 0, (255, 255, 255))
+time.sleep(0.1)
+shown = pixels.show_count
+time.sleep(1)
+static = pixels.show_count - shown
+print("show() calls in a second of static indicators: %d" % static)
+if static:
+    sys.exit("FAIL: show() was called for frames that did not change")
+
+# a command on a quiet strip is drawn straight away, not at the next frame deadline
+delays = []
+for n in range(20):
+    # land at different points of the frame
+    time.sleep(0.013)
+    shown = pixels.show_count
+    begin = time.monotonic()
+    renderer.set_pixel("indicators", 1, (255, 0, 0) if n % 2 else (0, 255, 0))
+    while pixels.show_count == shown:
+        time.sleep(0.0002)
+    delays.append(1000 * (time.monotonic() - begin))
+mean = sum(delays) / len(delays)
+print("command to strip: mean %.2f ms, max %.2f ms (budget %.2f ms)" % (mean, max(delays), 1000.0 / fps))
+if mean > 500.0 / fps:
+    sys.exit("FAIL: commands waited for the frame deadline, mean %.2f ms" % mean)
+
+shown = pixels.show_count
+renderer.set_brightness(0.2)
+time.sleep(0.5)
+resent = pixels.show_count - shown
+print("show() calls after a brightness change: %d" % resent)
+if resent != 1:
+    sys.exit("FAIL: a brightness change sent %d frames instead of one" % resent)
+if pixels.last_frame != compositor.transform.apply(compositor.frame):
+    sys.exit("FAIL: the strip does not show the composed frame at the new brightness")
+
+renderer.stop()
+print("frames pushed: %d" % pixels.show_count)
+
+# lighting one indicator recomposites that pixel only, the rest of the frame is left alone
+before = bytes(compositor.frame)
+lights.indicators[3] = (255, 0, 0)
+region = compositor.compose()
+print("region recomposited for one indicator: %s" % (region,))
+bpp = compositor.bpp
+if region != (3, 4):
+    sys.exit("FAIL: one indicator recomposited pixels %s" % (region,))
+if compositor.frame[:3 * bpp] != before[:3 * bpp] or compositor.frame[4 * bpp:] != before[4 * bpp:]:
+    sys.exit("FAIL: pixels other than the indicator changed")
+if compositor.compose() is not None:
+    sys.exit("FAIL: an unchanged frame was recomposited")
+print("render loop ok")
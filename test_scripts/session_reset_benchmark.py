@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# time from the end of one guest's session until the booth is ready for the next one, resetting
+# in place (the default) against restarting the program with os.execv (SHOW_RESTART=exec)
+# runs strawberrycough.py in sim mode with a short show (start button, one question that times out
+# after half a second) and reads its "ready for the next guest" log lines; its latency histograms
+# and audio cache go to a temporary directory, so the booth's own are left alone
+# on the Pi the exec path also re-imports pygame, neopixel and RPi.GPIO and sets the strip up again,
+# so it costs more there than in sim mode
+# $ python3 test_scripts/session_reset_benchmark.py [sessions]
+
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+READY = re.compile(r"ready for the next guest ([0-9.]+) ms")
+
+sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+SHOW = {
+    "defaults": {"answers": ["yes", "no"], "motors": {"yes": [], "no": []}, "motor_seconds": 0,
+                 "warning": "inactivitywarning.mp3", "warning_timeout": 10, "timeout": 0.5},
+    "phases": [
+        {"name": "start", "kind": "start", "button": "start", "lights": "questions", "sfx": "buttonpress.mp3"},
+        {"name": "q1", "kind": "question", "audio": "q1.mp3", "indicator": 0},
+    ],
+}
+
+# "ready" times in ms for sessions sessions with the given restart mode, files go in directory
+def measure(mode, directory):
+    env = dict(os.environ, SHOW_FILE=os.path.join(directory, "show.json"), SHOW_RESTART=mode, SHOW_HARDWARE="sim",
+               SHOW_LATENCY_FILE=os.path.join(directory, "latency.json"), SHOW_PCM_DIR=os.path.join(directory, "pcm"))
+    # every exec starts the press script again, one start press per process is enough
+    env["SHOW_PRESSES"] = "start:1.5" if mode == "exec" else " ".join(["start:1.5"] * (sessions + 1))
+    show = subprocess.Popen([sys.executable, os.path.join(ROOT, "strawberrycough.py")], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    watchdog = threading.Timer(10 + 5 * sessions, show.kill)
+    watchdog.start()
+    times = []
+    try:
+        for line in show.stdout:
+            match = READY.search(line)
+            if match:
+                times.append(float(match.group(1)))
+                if len(times) == sessions:
+                    break
+    finally:
+        watchdog.cancel()
+        show.kill()
+        show.wait()
+    if len(times) < sessions:
+        sys.exit("FAIL: only %d of %d sessions with SHOW_RESTART=%s" % (len(times), sessions, mode))
+    return sorted(times)
+
+with tempfile.TemporaryDirectory(prefix="session-reset-") as directory:
+    with open(os.path.join(directory, "show.json"), "w") as f:
+        json.dump(SHOW, f)
+    results = {mode: measure(mode, directory) for mode in ("reset", "exec")}
+
+for mode, times in results.items():
+    print("%-6s ready after p50 %8.1f ms  max %8.1f ms  (%d sessions)"
+          % (mode, times[len(times) // 2], times[-1], len(times)))
+print("in-place reset is %.0fx faster" % (results["exec"][len(results["exec"]) // 2]
+                                           / max(results["reset"][len(results["reset"]) // 2], 0.001)))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# compares the precomputed theater chase (ledeffects.theater_chase) with the original blocking loop
+# from strawberrycough.py, frame by frame over a rainbow, at strip lengths that are and are not a
+# multiple of three; the original covered range(0, 108, 3) of the 110 pixel strip, i.e. every whole
+# group of three, which is what it is generalised to for the other lengths
+# runs against an in-memory strip, no Pi or LEDs needed:
+# $ python3 test_scripts/theater_chase_test.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ledcache
+import ledeffects
+import ledlayers
+import ledtransform
+from fakepixels import FakeNeoPixel
+
+PIXEL_COUNTS = (110, 111, 301, 500)
+ORDER = "GRB"
+BRIGHTNESS = 0.5
+COLOR = (255, 255, 255)
+WAIT_MS = 50
+ITERATIONS = 3
+
+# the original loop from strawberrycough.py without its sleep, num_pixels // 3 * 3 is 108 for the booth
+def legacy_chase(strip, color, iterations):
+    last = len(strip) // 3 * 3
+    for j in range(iterations):
+        for q in range(3):
+            for i in range(0, last, 3):
+                strip[i+q] = color
+            strip.show()
+            yield
+            for i in range(0, last, 3):
+                strip[i+q] = (0, 0, 0)
+
+# every frame the legacy loop shows, over the first rainbow frame
+def legacy_frames(num_pixels, cache):
+    strip = FakeNeoPixel(num_pixels, brightness=BRIGHTNESS, pixel_order=ORDER)
+    cache.rainbow(strip).render(strip, 0)
+    return [strip.last_frame for _ in legacy_chase(strip, COLOR, ITERATIONS)]
+
+# the same frames through the compositor: the rainbow layer below, the chase on the effects layer
+def chase_frames(num_pixels, cache):
+    strip = FakeNeoPixel(num_pixels, pixel_order=ORDER)
+    compositor = ledlayers.Compositor(strip, {"all": (0, num_pixels)}, ledtransform.Transform(ORDER, BRIGHTNESS))
+    rainbow = compositor.add_layer("rainbow", "all", z=0, opaque=True)
+    effects = compositor.add_layer("effects", "all", z=2)
+    sequence = cache.rainbow(strip)
+    rainbow.blit(sequence.start, sequence.frame(0))
+    effect = ledeffects.theater_chase(effects, COLOR, WAIT_MS, ITERATIONS)
+    next(effect)
+    frames = []
+    for step in range(3 * ITERATIONS):
+        # half way through each step, as the render thread would see it
+        effect.send((step + 0.5) * WAIT_MS / 1000.0)
+        compositor.prepare()
+        compositor.show()
+        frames.append(strip.last_frame)
+    try:
+        effect.send((3 * ITERATIONS + 0.5) * WAIT_MS / 1000.0)
+    except StopIteration:
+        return frames
+    raise SystemExit("FAIL: the chase at %d pixels did not end after %d steps" % (num_pixels, 3 * ITERATIONS))
+
+if __name__ == "__main__":
+    cache = ledcache.FrameCache(use_disk=False)
+    for num_pixels in PIXEL_COUNTS:
+        legacy = legacy_frames(num_pixels, cache)
+        # the second run uses the steps precomputed by the first
+        for run in ("first", "cached"):
+            chase = chase_frames(num_pixels, cache)
+            for step, (a, b) in enumerate(zip(legacy, chase)):
+                if a != b:
+                    pixels = [p for p in range(num_pixels) if a[p * 3:p * 3 + 3] != b[p * 3:p * 3 + 3]]
+                    sys.exit("FAIL: %s chase at %d pixels differs at step %d, pixels %s"
+                             % (run, num_pixels, step, pixels[:10]))
+        print("%4d pixels: %d steps identical to the original loop" % (num_pixels, len(legacy)))
+    print("theater chase ok")
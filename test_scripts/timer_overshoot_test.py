@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# (c) 2022 Bly Lee d.b.a. WonderGap, LLC
+# This code is licensed under MIT license
+# Solely intended for use at Science Gallery: Hooked in ATL, GA in 2022
+
+# deadlines on showruntime.Runtime with simulated GPIO, the silent mixer and the LED render thread
+# running against the in-memory strip, the way a question uses them
+# every round sets a warning and a timeout and presses an answer at a random moment: a press before
+# the timeout must never be missed, a cancelled warning must never fire, and no timer may fire more
+# than 10 ms late (the render thread shares the interpreter with the loop); the overshoot table from
+# Runtime.overshoot_report() is printed at the end
+# $ python3 test_scripts/timer_overshoot_test.py [rounds]
+
+import asyncio
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fakebooth
+import fakegpio as GPIO
+import fakemixer as pygame
+import showaudio
+import showinput
+import showruntime
+
+LIMIT_MS = 10.0
+BTN_YES = 19
+MOTOR = 6
+
+rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+GPIO.setmode(GPIO.BCM)
+GPIO.setup(BTN_YES, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+GPIO.setup(MOTOR, GPIO.OUT)
+buttons = showinput.InputQueue(GPIO, (BTN_YES,))
+
+lights = fakebooth.Lights()
+renderer = lights.renderer
+lights.start(questions=True)
+
+async def question(runtime, warned):
+    warning_at = random.uniform(0.02, 0.1)
+    timeout = random.uniform(0.05, 0.15)
+    press_at = random.uniform(0.0, 0.2)
+    async def warn():
+        warned.append(True)
+    runtime.listen(BTN_YES)
+    warning = runtime.after(warning_at, warn, "warning")
+    # pressed from another thread like a real button, fakegpio.press() holds the button down
+    presser = threading.Timer(press_at, GPIO.press, (BTN_YES, 0.01))
+    presser.start()
+    event = await runtime.press(timeout, "timeout")
+    warning.cancel()
+    presser.cancel()
+    warnings = len(warned)
+    runtime.ignore(BTN_YES)
+    # a press may only be missed if it came after the timeout, the warning only fires before the answer
+    if event is None and press_at < timeout - 0.03:
+        sys.exit("FAIL: a press %.0f ms before the timeout was missed" % (1000 * (timeout - press_at)))
+    await runtime.pulse((MOTOR,), 0.01, "motors")
+    await asyncio.sleep(0.03)
+    if len(warned) != warnings:
+        sys.exit("FAIL: the warning fired after it was called off")
+
+async def main():
+    runtime = showruntime.Runtime(buttons, GPIO, showaudio.AudioManager(pygame, showaudio.SoundCache(pygame)))
+    runtime.start()
+    warned = []
+    for _ in range(rounds):
+        before = len(warned)
+        await question(runtime, warned)
+        if len(warned) - before > 1:
+            sys.exit("FAIL: warning fired twice")
+    return runtime, len(warned)
+
+runtime, warnings = asyncio.run(main())
+renderer.stop()
+print("%d rounds, %d warnings, %d timeouts" % (rounds, warnings, runtime.overshoot.get("timeout").count
+                                                if "timeout" in runtime.overshoot else 0))
+print(runtime.overshoot_report())
+worst = max(h.largest for h in runtime.overshoot.values())
+if worst > LIMIT_MS:
+    sys.exit("FAIL: a timer fired %.1f ms late" % worst)
+print("every timer fired within %.0f ms of its deadline" % LIMIT_MS)